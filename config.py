@@ -1,10 +1,40 @@
 import os
-from dotenv import load_dotenv
-
-load_dotenv()
+from dataclasses import dataclass
+from dotenv import dotenv_values, find_dotenv
+
+def _get(env: dict, key: str, default: str) -> str:
+    value = env.get(key)
+    return default if value is None else value
+
+def _get_bool(env: dict, key: str, default: str) -> bool:
+    return _get(env, key, default).lower() == 'true'
+
+@dataclass(frozen=True)
+class Config:
+    """从环境变量解析出的配置（已完成类型转换）"""
+    wechat_webhook_url: str
+    always_send_report: bool
+    send_signal_alerts: bool
+    check_market_hours: bool
+    price_change_threshold: float
+    volume_spike_threshold: float
+
+def _load() -> Config:
+    """解析配置（.env 与系统环境变量只读取一次，系统环境变量优先）"""
+    env = {**dotenv_values(find_dotenv()), **os.environ}
+    return Config(
+        wechat_webhook_url=_get(env, 'WECHAT_WEBHOOK_URL', ''),
+        always_send_report=_get_bool(env, 'ALWAYS_SEND_REPORT', 'true'),
+        send_signal_alerts=_get_bool(env, 'SEND_SIGNAL_ALERTS', 'true'),
+        check_market_hours=_get_bool(env, 'CHECK_MARKET_HOURS', 'true'),
+        price_change_threshold=float(_get(env, 'PRICE_CHANGE_THRESHOLD', '5.0')),
+        volume_spike_threshold=float(_get(env, 'VOLUME_SPIKE_THRESHOLD', '2.0')),
+    )
+
+CONFIG = _load()
 
 # 企业微信配置
-WECHAT_WEBHOOK_URL = os.getenv('WECHAT_WEBHOOK_URL', '')
+WECHAT_WEBHOOK_URL = CONFIG.wechat_webhook_url
 
 # 数据库配置
 DATABASE_PATH = 'stocks.db'
@@ -17,16 +47,16 @@ TENCENT_API_BASE = 'https://qt.gtimg.cn/q='
 UPDATE_INTERVAL_HOURS = 1
 
 # 推送策略配置
-ALWAYS_SEND_REPORT = os.getenv('ALWAYS_SEND_REPORT', 'true').lower() == 'true'
-SEND_SIGNAL_ALERTS = os.getenv('SEND_SIGNAL_ALERTS', 'true').lower() == 'true'
+ALWAYS_SEND_REPORT = CONFIG.always_send_report
+SEND_SIGNAL_ALERTS = CONFIG.send_signal_alerts
 
 # 开市时间检查配置
-CHECK_MARKET_HOURS = os.getenv('CHECK_MARKET_HOURS', 'true').lower() == 'true'
+CHECK_MARKET_HOURS = CONFIG.check_market_hours
 
 # 信号检测配置
-PRICE_CHANGE_THRESHOLD = float(os.getenv('PRICE_CHANGE_THRESHOLD', '5.0'))
-VOLUME_SPIKE_THRESHOLD = float(os.getenv('VOLUME_SPIKE_THRESHOLD', '2.0'))
+PRICE_CHANGE_THRESHOLD = CONFIG.price_change_threshold
+VOLUME_SPIKE_THRESHOLD = CONFIG.volume_spike_threshold
 
 # 日志配置
 LOG_LEVEL = 'INFO'
-LOG_FILE = 'signalbot.log'
\ No newline at end of file
+LOG_FILE = 'signalbot.log'
@@ -3,7 +3,7 @@
 调试市场开市时间
 """
 from datetime import datetime, time
-import pytz
+from zoneinfo import ZoneInfo
 from market_hours import MarketHours
 
 def debug_market_hours():
@@ -11,11 +11,11 @@ def debug_market_hours():
     print("🔍 调试市场开市时间\n")
     
     market_hours = MarketHours()
-    china_tz = pytz.timezone('Asia/Shanghai')
+    china_tz = ZoneInfo('Asia/Shanghai')
     
     # 检查今天是否为交易日
     now = datetime.now()
-    beijing_now = china_tz.localize(now)
+    beijing_now = now.replace(tzinfo=china_tz)
     
     print(f"当前时间: {now}")
     print(f"北京时间: {beijing_now}")
@@ -35,18 +35,12 @@ def debug_market_hours():
     print(f"是否在港股节假日列表: {date_str in market_hours.hk_stock_holidays}")
     
     # 测试特定时间的开市状态
-    test_times = [
-        beijing_now.replace(hour=10, minute=0, second=0, microsecond=0),
-        beijing_now.replace(hour=14, minute=0, second=0, microsecond=0),
-        beijing_now.replace(hour=12, minute=0, second=0, microsecond=0),
-        beijing_now.replace(hour=16, minute=0, second=0, microsecond=0),
-    ]
+    test_times = [beijing_now.replace(hour=hour, minute=0, second=0, microsecond=0) for hour in (10, 14, 12, 16)]
+    open_status = market_hours.are_markets_open_batch(['A股', '港股'], test_times)
     
     print("\n时间点测试:")
-    for test_time in test_times:
-        a_open = market_hours.is_market_open('A股', test_time)
-        hk_open = market_hours.is_market_open('港股', test_time)
-        print(f"{test_time.strftime('%H:%M')}: A股={a_open}, 港股={hk_open}")
+    for i, test_time in enumerate(test_times):
+        print(f"{test_time.strftime('%H:%M')}: A股={open_status['A股'][i]}, 港股={open_status['港股'][i]}")
     
     # 测试股票代码识别
     print("\n股票代码识别测试:")
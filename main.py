@@ -1,15 +1,12 @@
 #!/usr/bin/env python3
 import logging
-import schedule
 import time
 import argparse
-from datetime import datetime
-from stock_fetcher import StockFetcher
-from wechat_notifier import WeChatNotifier
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from functools import lru_cache
 from stock_manager import StockManager
-from signal_detector import SignalDetector
-from stock_screener import StockScreener, ScreenerCriteria
-from market_hours import MarketHours
 from process_manager import ProcessManager
 from config import LOG_LEVEL, LOG_FILE, UPDATE_INTERVAL_HOURS, ALWAYS_SEND_REPORT, SEND_SIGNAL_ALERTS, CHECK_MARKET_HOURS
 
@@ -24,18 +21,45 @@ def setup_logging():
         ]
     )
 
+@lru_cache(maxsize=1)
+def _manager() -> StockManager:
+    """进程内共享的股票管理器（只初始化一次数据库）"""
+    return StockManager()
+
+@lru_cache(maxsize=1)
+def _notifier():
+    """进程内共享的企业微信通知器"""
+    from wechat_notifier import WeChatNotifier
+    return WeChatNotifier()
+
+@lru_cache(maxsize=1)
+def _fetcher():
+    """进程内共享的股票数据获取器（行情/名称缓存和HTTP连接池跨监控周期复用）"""
+    from stock_fetcher import StockFetcher
+    return StockFetcher()
+
+@lru_cache(maxsize=1)
+def _market_hours():
+    """进程内共享的市场时间管理器"""
+    from market_hours import MarketHours
+    return MarketHours()
+
+def _save_stock_data(stock_manager: StockManager, stock_data: dict):
+    """保存本次监控获取的股票数据（历史数据与名称在同一个事务中写入）"""
+    stock_manager.save_stock_snapshot(
+        [(code, data['current_price'], data['change_percent'], data['volume'])
+         for code, data in sorted(stock_data.items())],
+        [(data['name'], code) for code, data in stock_data.items() if data.get('name')]
+    )
+
 def monitor_stocks():
     """SignalBot 智能监控股票并发送信号通知"""
     logger = logging.getLogger(__name__)
     logger.info("🤖 SignalBot 开始智能监控任务")
     
     try:
-        # 初始化组件
-        stock_manager = StockManager()
-        stock_fetcher = StockFetcher()
-        notifier = WeChatNotifier()
-        signal_detector = SignalDetector()
-        market_hours = MarketHours()
+        stock_manager = _manager()
+        market_hours = _market_hours()
         
         # 获取需要监控的股票代码
         all_stock_codes = stock_manager.get_active_stocks()
@@ -46,23 +70,29 @@ def monitor_stocks():
         
         # 根据配置决定是否检查开市时间
         if CHECK_MARKET_HOURS:
+            # 本次检查统一使用同一个时间点
+            now = datetime.now()
+            
             # 检查是否有任何市场开市
-            if not market_hours.should_send_notification(all_stock_codes):
+            if not market_hours.should_send_notification(all_stock_codes, now):
                 # 获取市场状态信息
-                a_stock_status = market_hours.get_market_status_message('A股')
-                hk_stock_status = market_hours.get_market_status_message('港股')
+                a_stock_status = market_hours.get_market_status_message('A股', now)
+                hk_stock_status = market_hours.get_market_status_message('港股', now)
                 logger.info(f"📊 市场状态检查: {a_stock_status}, {hk_stock_status}")
                 logger.info("🔕 所有相关市场均已休市，跳过本次监控")
                 return
             
             # 过滤出开市的股票代码
-            filtered_codes = market_hours.get_filtered_stock_codes(all_stock_codes)
+            filtered_codes = market_hours.get_filtered_stock_codes(all_stock_codes, now)
             stock_codes = []
             for market, codes in filtered_codes.items():
                 if codes:
                     logger.info(f"🟢 {market}开市中，监控 {len(codes)} 只股票: {codes}")
                     stock_codes.extend(codes)
             
+            # 去重（保持原有顺序）
+            stock_codes = list(dict.fromkeys(stock_codes))
+            
             if not stock_codes:
                 logger.info("📊 虽有股票代码，但相关市场均已休市，跳过本次监控")
                 return
@@ -70,34 +100,36 @@ def monitor_stocks():
             logger.info(f"🎯 开始监控 {len(stock_codes)} 只开市股票: {stock_codes}")
         else:
             # 不检查开市时间，监控所有股票
-            stock_codes = all_stock_codes
+            stock_codes = list(dict.fromkeys(all_stock_codes))
             logger.info(f"🎯 开始监控 {len(stock_codes)} 只股票 (未启用开市时间检查): {stock_codes}")
         
-        # 获取股票数据
-        stock_data = stock_fetcher.get_stock_data(stock_codes)
+        # 通过开市检查后再初始化其余组件
+        from signal_detector import SignalDetector
+        stock_fetcher = _fetcher()
+        notifier = _notifier()
+        signal_detector = SignalDetector()
+        
+        # 获取股票数据，同时在后台读取缓存的平均成交量用于信号检测
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            avg_volumes_future = executor.submit(stock_manager.get_average_volumes, stock_codes)
+            stock_data = stock_fetcher.get_stock_data(stock_codes)
+            avg_volumes = avg_volumes_future.result()
         
         if not stock_data:
             logger.warning("未获取到任何股票数据")
             return
         
-        # 获取历史数据用于信号检测
-        historical_data = stock_manager.get_historical_volumes(stock_codes)
+        # 统计股票和指数数量
+        indices_count = sum('指数' in data.get('market', '') for data in stock_data.values())
+        stocks_count = len(stock_data) - indices_count
         
         # 检测信号
-        signals = signal_detector.detect_signals(stock_data, historical_data)
-        
-        # 保存历史数据
-        for code, data in stock_data.items():
-            stock_manager.save_stock_history(
-                code, 
-                data['current_price'], 
-                data['change_percent'], 
-                data['volume']
-            )
-            
-            # 更新股票名称（如果数据库中没有）
-            if data.get('name'):
-                stock_manager.update_stock_info(code, data['name'])
+        signals = signal_detector.detect_signals(stock_data, avg_volumes=avg_volumes)
+        notify = signal_detector.should_notify(signals)
+        
+        # 在后台线程保存数据，与下面的企业微信推送并行进行
+        save_thread = threading.Thread(target=_save_stock_data, args=(stock_manager, stock_data))
+        save_thread.start()
         
         # 根据配置决定推送策略
         report_sent = False
@@ -107,10 +139,6 @@ def monitor_stocks():
             success = notifier.send_stock_report(stock_data)
             report_sent = success
             if success:
-                # 统计股票和指数数量
-                stocks_count = sum(1 for data in stock_data.values() if '指数' not in data.get('market', ''))
-                indices_count = sum(1 for data in stock_data.values() if '指数' in data.get('market', ''))
-                
                 if stocks_count > 0 and indices_count > 0:
                     logger.info(f"📊 发送监控报告: {stocks_count} 只股票, {indices_count} 个指数")
                 elif stocks_count > 0:
@@ -119,18 +147,18 @@ def monitor_stocks():
                     logger.info(f"📊 发送指数监控报告: {indices_count} 个指数")
         
         # 如果检测到重要信号，发送信号预警
-        if SEND_SIGNAL_ALERTS and signal_detector.should_notify(signals):
+        if SEND_SIGNAL_ALERTS and notify:
             signal_message = signal_detector.format_signals_for_notification(signals, stock_data)
             signal_sent = notifier.send_signal_alert(signal_message)
             if signal_sent:
                 logger.info(f"🚨 发送信号预警: {len(signals)} 只股票有重要信号")
         
+        save_thread.join()
+        
         # 如果既不发送常规报告，也没有信号，则记录日志
-        if not ALWAYS_SEND_REPORT and not signal_detector.should_notify(signals):
-            stocks_count = sum(1 for data in stock_data.values() if '指数' not in data.get('market', ''))
-            indices_count = sum(1 for data in stock_data.values() if '指数' in data.get('market', ''))
+        if not ALWAYS_SEND_REPORT and not notify:
             logger.info(f"📊 监控完成，未检测到重要信号，未发送通知 ({stocks_count} 只股票, {indices_count} 个指数)")
-        elif report_sent or signal_detector.should_notify(signals):
+        elif report_sent or notify:
             logger.info(f"✅ SignalBot 任务完成")
         else:
             logger.error("❌ 通知发送失败")
@@ -144,13 +172,12 @@ def add_stock_command(code: str, name: str = "", auto_restart: bool = True):
     if not name:
         print("📡 正在自动获取股票名称...")
     
-    manager = StockManager()
+    manager = _manager()
     success = manager.add_stock(code, name)
     
     if success:
         # 获取添加后的股票信息以显示完整信息
-        stocks = manager.list_stocks()
-        added_stock = next((s for s in stocks if s['code'] == code), None)
+        added_stock = manager.get_stock(code)
         if added_stock:
             display_name = added_stock['name'] if added_stock['name'] != '未知' else '(未获取到名称)'
             print(f"✅ 成功添加股票: {code} {display_name} [{added_stock['market']}]")
@@ -165,7 +192,7 @@ def add_stock_command(code: str, name: str = "", auto_restart: bool = True):
 
 def remove_stock_command(code: str, auto_restart: bool = True):
     """移除股票命令"""
-    manager = StockManager()
+    manager = _manager()
     success = manager.remove_stock(code)
     if success:
         print(f"✅ 成功移除股票: {code}")
@@ -178,7 +205,7 @@ def remove_stock_command(code: str, auto_restart: bool = True):
 
 def list_stocks_command():
     """列出股票命令"""
-    manager = StockManager()
+    manager = _manager()
     stocks = manager.list_stocks()
     
     if not stocks:
@@ -195,30 +222,38 @@ def list_stocks_command():
 def update_stock_names_command():
     """更新所有股票名称"""
     print("🔄 正在更新所有股票名称...")
-    manager = StockManager()
+    manager = _manager()
     stocks = manager.list_stocks()
     
-    updated_count = 0
-    for stock in stocks:
-        if stock['is_active'] and (not stock['name'] or stock['name'] == '未知'):
-            print(f"📡 正在获取 {stock['code']} 的名称...")
-            fetcher = StockFetcher()
-            name = fetcher.get_stock_name(stock['code'])
+    fetcher = _fetcher()
+    
+    pending = [
+        stock['code'] for stock in stocks
+        if stock['is_active'] and (not stock['name'] or stock['name'] == '未知')
+    ]
+    
+    # 一次批量请求获取所有名称，最后一次性写入数据库
+    name_updates = []
+    if pending:
+        print(f"📡 正在批量获取 {len(pending)} 只股票的名称...")
+        names = fetcher.get_stock_names_batch(pending)
+        for code in pending:
+            name = names.get(code)
             if name:
-                success = manager.update_stock_info(stock['code'], name)
-                if success:
-                    print(f"✅ 更新成功: {stock['code']} -> {name}")
-                    updated_count += 1
-                else:
-                    print(f"❌ 更新失败: {stock['code']}")
+                print(f"✅ 获取成功: {code} -> {name}")
+                name_updates.append((name, code))
             else:
-                print(f"⚠️  无法获取 {stock['code']} 的名称")
+                print(f"⚠️  无法获取 {code} 的名称")
+    
+    updated_count = manager.update_stock_names_bulk(name_updates) if name_updates else 0
+    if updated_count < len(name_updates):
+        print(f"❌ {len(name_updates) - updated_count} 只股票名称更新失败")
     
     print(f"🎉 更新完成，共更新了 {updated_count} 只股票的名称")
 
 def test_notification():
     """测试通知"""
-    notifier = WeChatNotifier()
+    notifier = _notifier()
     success = notifier.send_test_message()
     if success:
         print("✅ 测试通知发送成功")
@@ -235,7 +270,8 @@ def screen_stocks_command(market: str = "A股", top_n: int = 10):
     print(f"🎯 开始智能筛选{market}优质股票...")
     
     try:
-        screener = StockScreener()
+        from stock_screener import StockScreener
+        screener = StockScreener(_fetcher())
         results = screener.get_recommended_stocks(market, top_n)
         
         if not results:
@@ -264,7 +300,7 @@ def screen_stocks_command(market: str = "A股", top_n: int = 10):
             if choice:
                 try:
                     indices = [int(x.strip()) - 1 for x in choice.split(',')]
-                    manager = StockManager()
+                    manager = _manager()
                     added_count = 0
                     
                     for idx in indices:
@@ -289,7 +325,8 @@ def analyze_stock_command(code: str):
     print(f"🔍 正在分析股票: {code}")
     
     try:
-        screener = StockScreener()
+        from stock_screener import StockScreener, ScreenerCriteria
+        screener = StockScreener(_fetcher())
         
         # 获取股票基础数据
         basic_data = screener._get_basic_data(code)
@@ -349,50 +386,48 @@ def market_status_command():
     print("📊 正在检查市场状态...")
     
     try:
-        market_hours = MarketHours()
+        market_hours = _market_hours()
+        now = datetime.now()
         
         # 检查A股状态
-        a_stock_status = market_hours.get_market_status_message('A股')
+        a_stock_status = market_hours.get_market_status_message('A股', now)
         print(f"\n{a_stock_status}")
         
         # 检查港股状态
-        hk_stock_status = market_hours.get_market_status_message('港股')
+        hk_stock_status = market_hours.get_market_status_message('港股', now)
         print(f"{hk_stock_status}")
         
         # 检查监控的股票
-        stock_manager = StockManager()
+        stock_manager = _manager()
         stock_codes = stock_manager.get_active_stocks()
         
         if stock_codes:
             print(f"\n📋 当前监控的股票/指数 ({len(stock_codes)} 只):")
             
             # 按市场分类显示
-            filtered_codes = market_hours.get_filtered_stock_codes(stock_codes)
+            filtered_codes = market_hours.get_filtered_stock_codes(stock_codes, now)
             
             for market, codes in filtered_codes.items():
                 if codes:
                     # 指数跟随对应市场的开市时间
                     if market == 'A股指数':
-                        market_open = market_hours.is_market_open('A股')
+                        market_open = market_hours.is_market_open('A股', now)
                     elif market == '港股指数':
-                        market_open = market_hours.is_market_open('港股')
+                        market_open = market_hours.is_market_open('港股', now)
                     else:
-                        market_open = market_hours.is_market_open(market)
+                        market_open = market_hours.is_market_open(market, now)
                     
                     status_icon = "🟢" if market_open else "🔴"
                     print(f"  {status_icon} {market}: {len(codes)} 只 - {', '.join(codes)}")
             
             # 显示休市的股票
-            all_filtered = []
-            for codes in filtered_codes.values():
-                all_filtered.extend(codes)
-            
-            closed_stocks = [code for code in stock_codes if code not in all_filtered]
+            open_set = set().union(*filtered_codes.values())
+            closed_stocks = [code for code in stock_codes if code not in open_set]
             if closed_stocks:
                 print(f"  🔴 休市: {len(closed_stocks)} 只 - {', '.join(closed_stocks)}")
             
             # 总结
-            active_count = len(all_filtered)
+            active_count = sum(len(codes) for codes in filtered_codes.values())
             if active_count > 0:
                 print(f"\n✅ 当前有 {active_count} 只股票/指数的市场正在开市")
             else:
@@ -418,7 +453,7 @@ def add_indices_command():
         ('HSI', '恒生指数'),
     ]
     
-    manager = StockManager()
+    manager = _manager()
     added_count = 0
     
     print(f"\n📊 准备添加 {len(major_indices)} 个主要指数:")
@@ -522,21 +557,61 @@ def daemon_cleanup_command():
     process_manager = ProcessManager()
     process_manager.cleanup()
 
+def _seconds_until_next_run(interval: float) -> float:
+    """
+    计算距离下一次执行监控的秒数
+    启用开市时间检查时，如果按固定间隔执行的时间点所有相关市场都休市，
+    则直接等到下一个交易时段开始，避免休市期间的无效唤醒
+    """
+    if not CHECK_MARKET_HOURS:
+        return interval
+    
+    logger = logging.getLogger(__name__)
+    market_hours = _market_hours()
+    run_at = datetime.now() + timedelta(seconds=interval)
+    
+    stock_codes = _manager().get_active_stocks()
+    if not stock_codes or market_hours.should_send_notification(stock_codes, run_at):
+        return interval
+    
+    # 只等待自选股实际涉及的市场，例如只有A股时不会在港股开市时唤醒
+    markets = market_hours.get_markets_for_codes(stock_codes)
+    if not markets:
+        return interval
+    
+    try:
+        next_start = min(
+            market_hours.get_next_trading_session(market, run_at)[0].replace(tzinfo=None)
+            for market in markets
+        )
+    except Exception as e:
+        logger.warning(f"计算下一个交易时段失败，按固定间隔执行: {e}")
+        return interval
+    
+    logger.info(f"💤 下次执行时相关市场均休市，将在下一个交易时段开始时执行: {next_start.strftime('%Y-%m-%d %H:%M')}")
+    return interval + (next_start - run_at).total_seconds()
+
 def start_scheduler():
     """启动定时任务"""
     logger = logging.getLogger(__name__)
     logger.info(f"启动股票监控定时任务，每 {UPDATE_INTERVAL_HOURS} 小时执行一次")
     
-    # 设置定时任务
-    schedule.every(UPDATE_INTERVAL_HOURS).hours.do(monitor_stocks)
+    interval = UPDATE_INTERVAL_HOURS * 3600
+    next_run = time.monotonic() + _seconds_until_next_run(interval)
     
     print(f"📅 股票监控已启动，每 {UPDATE_INTERVAL_HOURS} 小时执行一次")
     print("按 Ctrl+C 停止监控")
     
     try:
         while True:
-            schedule.run_pending()
-            time.sleep(60)  # 每分钟检查一次
+            # 直接休眠到下一次执行时间，每个周期只唤醒一次
+            remaining = next_run - time.monotonic()
+            if remaining > 0:
+                time.sleep(remaining)
+                continue
+            
+            monitor_stocks()
+            next_run = time.monotonic() + _seconds_until_next_run(interval)
     except KeyboardInterrupt:
         logger.info("用户停止了股票监控")
         print("\n👋 股票监控已停止")
@@ -2,10 +2,69 @@
 股票市场开市时间判断模块
 支持A股和港股的开市时间检查
 """
+import bisect
 import logging
-from datetime import datetime, time
-from typing import Dict, List, Tuple
-import pytz
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+# A股指数代码
+A_STOCK_INDICES = frozenset({
+    '000300.SS',  # 沪深300
+    '000905.SS',  # 中证500
+    '000016.SS',  # 上证50
+    # 简化格式
+    'sh000300',   # 沪深300
+    'sh000905',   # 中证500
+    'sh000016',   # 上证50
+})
+
+# 港股指数代码
+HK_STOCK_INDICES = frozenset({
+    'HSI',        # 恒生指数
+    'hk.HSI',     # 恒生指数（带前缀）
+})
+
+# 代码前缀（str.startswith 接受元组，一次调用完成匹配）
+_A_PREFIXES = ('sh', 'sz')
+_HK_PREFIXES = ('hk',)
+
+@lru_cache(maxsize=4096)
+def _classify_code(code: str) -> Optional[str]:
+    """
+    判断代码所属市场（包括股票和指数）
+    
+    Returns:
+        'A' (A股)、'H' (港股) 或 None (无法识别)
+    """
+    if code.startswith(_A_PREFIXES):
+        return 'A'
+    if code.startswith(_HK_PREFIXES):
+        return 'H'
+    n = len(code)
+    if n == 6 and code.isdecimal():
+        return 'A'
+    if n == 5 and code.isdecimal():
+        return 'H'
+    if code in A_STOCK_INDICES:
+        return 'A'
+    if code in HK_STOCK_INDICES:
+        return 'H'
+    return None
+
+@dataclass
+class MarketCfg:
+    """单个市场的交易时间配置"""
+    name: str
+    fixed_tz: timezone                      # 开市判断用的固定偏移时区
+    tz: ZoneInfo                            # 交易时段起止时间所在时区
+    sessions: List[Tuple[time, time]]
+    sessions_sec: List[Tuple[int, int]]     # 交易时段（当日秒数）
+    weekdays: List[int]
+    holiday_ords: frozenset
+    trading_ords: List[int] = field(default_factory=list)
 
 class MarketHours:
     """股票市场开市时间管理器"""
@@ -14,8 +73,12 @@ class MarketHours:
         self.logger = logging.getLogger(__name__)
         
         # 定义时区
-        self.china_tz = pytz.timezone('Asia/Shanghai')
-        self.hk_tz = pytz.timezone('Asia/Hong_Kong')
+        self.china_tz = ZoneInfo('Asia/Shanghai')
+        self.hk_tz = ZoneInfo('Asia/Hong_Kong')
+        
+        # 开市判断使用固定UTC+8偏移（两地交易时段内均无夏令时），避免时区转换表查找
+        self._cn_fixed = timezone(timedelta(hours=8))
+        self._hk_fixed = timezone(timedelta(hours=8))
         
         # A股开市时间 (北京时间)
         self.a_stock_sessions = [
@@ -29,6 +92,10 @@ class MarketHours:
             (time(13, 0), time(16, 0))     # 下午交易时段
         ]
         
+        # 交易时段转换为当日秒数，判断时只需比较整数
+        self._a_sessions_sec = [(self._tod(start), self._tod(end)) for start, end in self.a_stock_sessions]
+        self._hk_sessions_sec = [(self._tod(start), self._tod(end)) for start, end in self.hk_stock_sessions]
+        
         # A股交易日 (周一到周五)
         self.a_stock_weekdays = [0, 1, 2, 3, 4]  # Monday=0, Sunday=6
         
@@ -37,7 +104,7 @@ class MarketHours:
         
         # 节假日配置 (可以后续扩展为从API获取)
         # 格式: 'YYYY-MM-DD'
-        self.a_stock_holidays = {
+        self.a_stock_holidays = frozenset({
             # 2024年节假日 (示例)
             '2024-01-01',  # 元旦
             '2024-02-10', '2024-02-11', '2024-02-12', '2024-02-13', '2024-02-14', '2024-02-15', '2024-02-16', '2024-02-17',  # 春节
@@ -54,9 +121,9 @@ class MarketHours:
             '2025-05-01', '2025-05-02', '2025-05-03',  # 劳动节
             '2025-05-31',  # 端午节
             '2025-10-01', '2025-10-02', '2025-10-03', '2025-10-04', '2025-10-05', '2025-10-06', '2025-10-07',  # 国庆节
-        }
+        })
         
-        self.hk_stock_holidays = {
+        self.hk_stock_holidays = frozenset({
             # 港股节假日 (示例)
             '2024-01-01',  # 新年
             '2024-02-10', '2024-02-12', '2024-02-13',  # 农历新年
@@ -83,7 +150,29 @@ class MarketHours:
             '2025-10-01',  # 国庆日
             '2025-10-07',  # 重阳节
             '2025-12-25', '2025-12-26',  # 圣诞节
+        })
+        
+        # 节假日预先转换为日期序数（date.toordinal），判断时无需格式化日期字符串
+        self._a_holiday_ords = frozenset(date.fromisoformat(d).toordinal() for d in self.a_stock_holidays)
+        self._hk_holiday_ords = frozenset(date.fromisoformat(d).toordinal() for d in self.hk_stock_holidays)
+        
+        # 按市场名称查找配置，两个市场共用同一套判断逻辑
+        self._markets = {
+            'A股': MarketCfg('A股', self._cn_fixed, self.china_tz, self.a_stock_sessions,
+                            self._a_sessions_sec, self.a_stock_weekdays, self._a_holiday_ords),
+            '港股': MarketCfg('港股', self._hk_fixed, self.hk_tz, self.hk_stock_sessions,
+                            self._hk_sessions_sec, self.hk_stock_weekdays, self._hk_holiday_ords),
         }
+        
+        # 按 (市场, 日期) 缓存交易日判断（时段判断只是几次整数比较，按实际时间计算，不做缓存）
+        self._trading_date_cached = lru_cache(maxsize=64)(self._check_trading_date)
+        
+        # 从今天起一段时间内的交易日序数表，用于二分查找下一个交易日
+        today_ord = date.today().toordinal()
+        for cfg in self._markets.values():
+            cfg.trading_ords = self._build_trading_ords(cfg.name, today_ord)
+        self._a_trading_ords = self._markets['A股'].trading_ords
+        self._hk_trading_ords = self._markets['港股'].trading_ords
     
     def is_market_open(self, market: str = 'A股', check_time: datetime = None) -> bool:
         """
@@ -99,74 +188,70 @@ class MarketHours:
         if check_time is None:
             check_time = datetime.now()
         
-        if market == 'A股':
-            return self._is_a_stock_open(check_time)
-        elif market == '港股':
-            return self._is_hk_stock_open(check_time)
-        else:
-            self.logger.warning(f"不支持的市场类型: {market}")
-            return False
+        return self._check_market_open(market, check_time)
     
-    def _is_a_stock_open(self, check_time: datetime) -> bool:
-        """检查A股是否开市"""
-        # 转换为北京时间
-        if check_time.tzinfo is None:
-            beijing_time = self.china_tz.localize(check_time)
-        else:
-            beijing_time = check_time.astimezone(self.china_tz)
+    def are_markets_open_batch(self, markets: List[str], check_times: List[datetime]) -> Dict[str, List[bool]]:
+        """
+        批量检查多个市场在多个时间点的开市状态
         
-        # 检查是否为交易日
-        if not self._is_trading_day(beijing_time, 'A股'):
+        Args:
+            markets: 市场类型列表
+            check_times: 检查时间列表
+            
+        Returns:
+            Dict[str, List[bool]]: 每个市场对应一个与 check_times 等长的开市状态列表
+        """
+        check_open = self._check_market_open
+        return {market: [check_open(market, t) for t in check_times] for market in markets}
+    
+    def _check_market_open(self, market: str, check_time: datetime) -> bool:
+        """检查指定市场是否开市"""
+        cfg = self._markets.get(market)
+        if cfg is None:
+            self.logger.warning(f"不支持的市场类型: {market}")
             return False
-        
-        # 检查是否在交易时段内
-        current_time = beijing_time.time()
-        for start_time, end_time in self.a_stock_sessions:
-            if start_time <= current_time <= end_time:
-                return True
-        
-        return False
+        return self._is_open(cfg, check_time)
     
-    def _is_hk_stock_open(self, check_time: datetime) -> bool:
-        """检查港股是否开市"""
-        # 转换为香港时间
+    def _is_open(self, cfg: MarketCfg, check_time: datetime) -> bool:
+        """检查指定市场配置下是否开市"""
+        # 转换为当地时间
         if check_time.tzinfo is None:
-            hk_time = self.hk_tz.localize(check_time)
+            local_time = check_time.replace(tzinfo=cfg.fixed_tz)
         else:
-            hk_time = check_time.astimezone(self.hk_tz)
+            local_time = check_time.astimezone(cfg.fixed_tz)
         
         # 检查是否为交易日
-        if not self._is_trading_day(hk_time, '港股'):
+        if not self._is_trading_day(local_time, cfg.name):
             return False
         
-        # 检查是否在交易时段内
-        current_time = hk_time.time()
-        for start_time, end_time in self.hk_stock_sessions:
-            if start_time <= current_time <= end_time:
+        # 检查是否在交易时段内（结束时刻本身算开市，超过结束时刻哪怕不足一秒也算休市）
+        tod = self._tod(local_time)
+        for start_sec, end_sec in cfg.sessions_sec:
+            if start_sec <= tod < end_sec or (tod == end_sec and not local_time.microsecond):
                 return True
         
         return False
     
+    @staticmethod
+    def _tod(t) -> int:
+        """当日秒数（time 或 datetime）"""
+        return t.hour * 3600 + t.minute * 60 + t.second
+    
     def _is_trading_day(self, check_time: datetime, market: str) -> bool:
         """检查是否为交易日"""
-        # 检查是否为周末
-        weekday = check_time.weekday()
-        
-        if market == 'A股':
-            if weekday not in self.a_stock_weekdays:
-                return False
-            # 检查是否为节假日
-            date_str = check_time.strftime('%Y-%m-%d')
-            return date_str not in self.a_stock_holidays
-        
-        elif market == '港股':
-            if weekday not in self.hk_stock_weekdays:
-                return False
-            # 检查是否为节假日
-            date_str = check_time.strftime('%Y-%m-%d')
-            return date_str not in self.hk_stock_holidays
+        return self._trading_date_cached(market, check_time.date())
+    
+    def _check_trading_date(self, market: str, check_date: date) -> bool:
+        """检查指定日期是否为交易日（未缓存）"""
+        cfg = self._markets.get(market)
+        if cfg is None:
+            return False
         
-        return False
+        # 检查是否为周末
+        if check_date.weekday() not in cfg.weekdays:
+            return False
+        # 检查是否为节假日
+        return check_date.toordinal() not in cfg.holiday_ords
     
     def get_next_trading_session(self, market: str = 'A股', check_time: datetime = None) -> Tuple[datetime, datetime]:
         """
@@ -182,94 +267,89 @@ class MarketHours:
         if check_time is None:
             check_time = datetime.now()
         
-        if market == 'A股':
-            return self._get_next_a_stock_session(check_time)
-        elif market == '港股':
-            return self._get_next_hk_stock_session(check_time)
-        else:
+        cfg = self._markets.get(market)
+        if cfg is None:
             raise ValueError(f"不支持的市场类型: {market}")
+        return self._next_session(cfg, check_time)
     
-    def _get_next_a_stock_session(self, check_time: datetime) -> Tuple[datetime, datetime]:
-        """获取下一个A股交易时段"""
-        # 转换为北京时间
+    def _next_session(self, cfg: MarketCfg, check_time: datetime) -> Tuple[datetime, datetime]:
+        """获取指定市场配置下的下一个交易时段"""
+        # 转换为当地时间
         if check_time.tzinfo is None:
-            beijing_time = self.china_tz.localize(check_time)
+            local_time = check_time.replace(tzinfo=cfg.tz)
         else:
-            beijing_time = check_time.astimezone(self.china_tz)
+            local_time = check_time.astimezone(cfg.tz)
         
-        current_date = beijing_time.date()
-        current_time = beijing_time.time()
+        current_date = local_time.date()
+        current_time = local_time.time()
         
         # 检查今天的交易时段
-        if self._is_trading_day(beijing_time, 'A股'):
-            for start_time, end_time in self.a_stock_sessions:
+        if self._is_trading_day(local_time, cfg.name):
+            for start_time, end_time in cfg.sessions:
                 if current_time < start_time:
                     # 今天还有交易时段
-                    start_dt = self.china_tz.localize(datetime.combine(current_date, start_time))
-                    end_dt = self.china_tz.localize(datetime.combine(current_date, end_time))
+                    start_dt = datetime.combine(current_date, start_time, tzinfo=cfg.tz)
+                    end_dt = datetime.combine(current_date, end_time, tzinfo=cfg.tz)
                     return start_dt, end_dt
         
         # 寻找下一个交易日
-        next_date = current_date
-        for _ in range(10):  # 最多查找10天
-            next_date = datetime.combine(next_date, time()).date()
-            next_date = next_date.replace(day=next_date.day + 1)
-            next_datetime = self.china_tz.localize(datetime.combine(next_date, time()))
-            
-            if self._is_trading_day(next_datetime, 'A股'):
-                start_time, end_time = self.a_stock_sessions[0]  # 第一个交易时段
-                start_dt = self.china_tz.localize(datetime.combine(next_date, start_time))
-                end_dt = self.china_tz.localize(datetime.combine(next_date, end_time))
-                return start_dt, end_dt
-        
-        raise RuntimeError("无法找到下一个A股交易时段")
+        next_date = self._next_trading_date(cfg.name, cfg.trading_ords, current_date)
+        if next_date is None:
+            raise RuntimeError(f"无法找到下一个{cfg.name}交易时段")
+        
+        start_time, end_time = cfg.sessions[0]  # 第一个交易时段
+        start_dt = datetime.combine(next_date, start_time, tzinfo=cfg.tz)
+        end_dt = datetime.combine(next_date, end_time, tzinfo=cfg.tz)
+        return start_dt, end_dt
     
-    def _get_next_hk_stock_session(self, check_time: datetime) -> Tuple[datetime, datetime]:
-        """获取下一个港股交易时段"""
-        # 转换为香港时间
-        if check_time.tzinfo is None:
-            hk_time = self.hk_tz.localize(check_time)
-        else:
-            hk_time = check_time.astimezone(self.hk_tz)
+    def _build_trading_ords(self, market: str, start_ord: int, days: int = 400) -> List[int]:
+        """生成从 start_ord 开始 days 天内的交易日序数表（升序）"""
+        return [
+            d for d in range(start_ord, start_ord + days)
+            if self._check_trading_date(market, date.fromordinal(d))
+        ]
+    
+    def _next_trading_date(self, market: str, trading_ords: List[int], current_date: date):
+        """
+        获取 current_date 之后的下一个交易日
         
-        current_date = hk_time.date()
-        current_time = hk_time.time()
+        Args:
+            market: 市场类型
+            trading_ords: 预先生成的交易日序数表
+            current_date: 当前日期
+            
+        Returns:
+            date: 下一个交易日，10天内找不到时返回None
+        """
+        current_ord = current_date.toordinal()
         
-        # 检查今天的交易时段
-        if self._is_trading_day(hk_time, '港股'):
-            for start_time, end_time in self.hk_stock_sessions:
-                if current_time < start_time:
-                    # 今天还有交易时段
-                    start_dt = self.hk_tz.localize(datetime.combine(current_date, start_time))
-                    end_dt = self.hk_tz.localize(datetime.combine(current_date, end_time))
-                    return start_dt, end_dt
+        # 当前日期在序数表覆盖范围内时直接二分查找
+        if trading_ords and trading_ords[0] - 1 <= current_ord:
+            i = bisect.bisect_right(trading_ords, current_ord)
+            if i < len(trading_ords):
+                return date.fromordinal(trading_ords[i])
         
-        # 寻找下一个交易日
+        # 超出序数表范围时逐日查找
         next_date = current_date
         for _ in range(10):  # 最多查找10天
-            next_date = datetime.combine(next_date, time()).date()
-            next_date = next_date.replace(day=next_date.day + 1)
-            next_datetime = self.hk_tz.localize(datetime.combine(next_date, time()))
-            
-            if self._is_trading_day(next_datetime, '港股'):
-                start_time, end_time = self.hk_stock_sessions[0]  # 第一个交易时段
-                start_dt = self.hk_tz.localize(datetime.combine(next_date, start_time))
-                end_dt = self.hk_tz.localize(datetime.combine(next_date, end_time))
-                return start_dt, end_dt
+            next_date += timedelta(days=1)
+            if self._trading_date_cached(market, next_date):
+                return next_date
         
-        raise RuntimeError("无法找到下一个港股交易时段")
+        return None
     
-    def get_market_status_message(self, market: str = 'A股') -> str:
+    def get_market_status_message(self, market: str = 'A股', check_time: datetime = None) -> str:
         """
         获取市场状态消息
         
         Args:
             market: 市场类型
+            check_time: 检查时间，默认为当前时间
             
         Returns:
             str: 状态消息
         """
-        now = datetime.now()
+        now = check_time or datetime.now()
         is_open = self.is_market_open(market, now)
         
         if is_open:
@@ -295,69 +375,48 @@ class MarketHours:
         if not stock_codes:
             return False
         
-        # 检查是否有任何相关市场开市
-        has_a_stock = any(self._is_a_stock_code(code) for code in stock_codes)
-        has_hk_stock = any(self._is_hk_stock_code(code) for code in stock_codes)
-        
-        if has_a_stock and self.is_market_open('A股', check_time):
-            return True
+        # 先判断市场状态（代价固定），都休市时无需扫描股票代码
+        a_open = self.is_market_open('A股', check_time)
+        hk_open = self.is_market_open('港股', check_time)
+        if not (a_open or hk_open):
+            return False
         
-        if has_hk_stock and self.is_market_open('港股', check_time):
-            return True
+        # 单次遍历，遇到开市市场的代码即返回
+        classify = _classify_code
+        for code in stock_codes:
+            kind = classify(code)
+            if (kind == 'A' and a_open) or (kind == 'H' and hk_open):
+                return True
         
         return False
     
-    def _is_a_stock_code(self, code: str) -> bool:
-        """判断是否为A股代码（包括股票和指数）"""
-        # A股股票代码：以 sh 或 sz 开头，或者是6位数字
-        if code.startswith(('sh', 'sz')):
-            return True
-        if len(code) == 6 and code.isdigit():
-            return True
-        
-        # A股指数代码：特定的指数代码
-        a_stock_indices = {
-            '000300.SS',  # 沪深300
-            '000905.SS',  # 中证500
-            '000016.SS',  # 上证50
-            # 简化格式
-            'sh000300',   # 沪深300
-            'sh000905',   # 中证500
-            'sh000016',   # 上证50
-        }
+    def get_markets_for_codes(self, stock_codes: List[str]) -> List[str]:
+        """
+        获取股票代码列表涉及的市场
         
-        return code in a_stock_indices
+        Args:
+            stock_codes: 股票代码列表
+            
+        Returns:
+            List[str]: 涉及的市场类型（'A股'、'港股'），无法识别的代码不计入
+        """
+        kinds = {_classify_code(code) for code in stock_codes}
+        return [market for kind, market in (('A', 'A股'), ('H', '港股')) if kind in kinds]
+    
+    @staticmethod
+    def _is_a_stock_code(code: str) -> bool:
+        """判断是否为A股代码（包括股票和指数）"""
+        return _classify_code(code) == 'A'
     
-    def _is_hk_stock_code(self, code: str) -> bool:
+    @staticmethod
+    def _is_hk_stock_code(code: str) -> bool:
         """判断是否为港股代码（包括股票和指数）"""
-        # 港股股票代码：以 hk 开头，或者是5位数字
-        if code.startswith('hk'):
-            return True
-        if len(code) == 5 and code.isdigit():
-            return True
-        
-        # 港股指数代码：特定的指数代码
-        hk_indices = {
-            'HSI',        # 恒生指数
-            'hk.HSI',     # 恒生指数（带前缀）
-        }
-        
-        return code in hk_indices
+        return _classify_code(code) == 'H'
     
-    def _is_index_code(self, code: str) -> bool:
+    @staticmethod
+    def _is_index_code(code: str) -> bool:
         """判断是否为指数代码"""
-        # A股指数
-        a_stock_indices = {
-            '000300.SS', '000905.SS', '000016.SS',
-            'sh000300', 'sh000905', 'sh000016'
-        }
-        
-        # 港股指数
-        hk_indices = {
-            'HSI', 'hk.HSI'
-        }
-        
-        return code in a_stock_indices or code in hk_indices
+        return code in A_STOCK_INDICES or code in HK_STOCK_INDICES
     
     def get_filtered_stock_codes(self, stock_codes: List[str], check_time: datetime = None) -> Dict[str, List[str]]:
         """
@@ -370,6 +429,9 @@ class MarketHours:
         Returns:
             Dict[str, List[str]]: 按市场分类的开市股票代码
         """
+        if check_time is None:
+            check_time = datetime.now()
+        
         result = {
             'A股': [],
             '港股': [],
@@ -377,16 +439,19 @@ class MarketHours:
             '港股指数': []
         }
         
+        # 每个市场的开市状态只计算一次
+        a_open = self.is_market_open('A股', check_time)
+        hk_open = self.is_market_open('港股', check_time)
+        if not (a_open or hk_open):
+            return result
+        
+        # 单次遍历，每个代码只分类一次
+        classify = _classify_code
         for code in stock_codes:
-            if self._is_a_stock_code(code) and self.is_market_open('A股', check_time):
-                if self._is_index_code(code):
-                    result['A股指数'].append(code)
-                else:
-                    result['A股'].append(code)
-            elif self._is_hk_stock_code(code) and self.is_market_open('港股', check_time):
-                if self._is_index_code(code):
-                    result['港股指数'].append(code)
-                else:
-                    result['港股'].append(code)
+            kind = classify(code)
+            if kind == 'A' and a_open:
+                result['A股指数' if self._is_index_code(code) else 'A股'].append(code)
+            elif kind == 'H' and hk_open:
+                result['港股指数' if self._is_index_code(code) else '港股'].append(code)
         
         return result
\ No newline at end of file
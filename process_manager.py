@@ -9,6 +9,7 @@ import signal
 import psutil
 import logging
 import subprocess
+from collections import deque
 from pathlib import Path
 from typing import Optional, Dict, Any
 from datetime import datetime
@@ -22,6 +23,9 @@ class ProcessManager:
         self.log_file = Path("signalbot_daemon.log")
         self.script_path = Path(__file__).parent / "main.py"
         
+        # 已验证过的SignalBot进程（is_running() 会校验创建时间，可防止PID被复用）
+        self._cached_proc: Optional[psutil.Process] = None
+        
     def get_running_process(self) -> Optional[psutil.Process]:
         """获取正在运行的SignalBot进程"""
         try:
@@ -29,11 +33,20 @@ class ProcessManager:
                 with open(self.pid_file, 'r') as f:
                     pid = int(f.read().strip())
                 
+                # PID未变且进程仍在运行时直接复用，跳过进程名和命令行校验
+                cached = self._cached_proc
+                if cached is not None and cached.pid == pid and cached.is_running():
+                    return cached
+                self._cached_proc = None
+                
                 # 检查进程是否还在运行
                 if psutil.pid_exists(pid):
                     proc = psutil.Process(pid)
                     # 验证是否是SignalBot进程
                     if 'python' in proc.name().lower() and 'main.py' in ' '.join(proc.cmdline()):
+                        # 预热CPU统计，之后调用 cpu_percent() 即可得到两次调用间的使用率
+                        proc.cpu_percent(interval=None)
+                        self._cached_proc = proc
                         return proc
                 
                 # PID文件存在但进程不存在，清理PID文件
@@ -42,6 +55,7 @@ class ProcessManager:
         except (FileNotFoundError, ValueError, psutil.NoSuchProcess, psutil.AccessDenied):
             pass
         
+        self._cached_proc = None
         return None
     
     def is_running(self) -> bool:
@@ -140,6 +154,7 @@ class ProcessManager:
     
     def get_status(self) -> Dict[str, Any]:
         """获取SignalBot状态信息"""
+        cached = self._cached_proc
         process = self.get_running_process()
         
         if not process:
@@ -153,11 +168,13 @@ class ProcessManager:
             }
         
         try:
+            # 进程是本次调用才找到的（CPU统计刚预热），需短暂采样才能得到有效的使用率
+            cpu_interval = None if process is cached else 0.1
             return {
                 'running': True,
                 'pid': process.pid,
                 'start_time': datetime.fromtimestamp(process.create_time()),
-                'cpu_percent': process.cpu_percent(),
+                'cpu_percent': process.cpu_percent(interval=cpu_interval),
                 'memory_mb': process.memory_info().rss / 1024 / 1024,
                 'status': process.status()
             }
@@ -206,13 +223,14 @@ class ProcessManager:
             return
         
         try:
+            # 只保留末尾若干行，避免把整个日志文件读入内存
             with open(self.log_file, 'r', encoding='utf-8') as f:
-                log_lines = f.readlines()
+                log_lines = deque(f, maxlen=max(lines, 0))
             
-            print(f"📋 最近 {min(lines, len(log_lines))} 行日志:")
+            print(f"📋 最近 {len(log_lines)} 行日志:")
             print("-" * 60)
             
-            for line in log_lines[-lines:]:
+            for line in log_lines:
                 print(line.rstrip())
                 
         except Exception as e:
@@ -228,6 +246,7 @@ class ProcessManager:
         
         stock_manager = StockManager()
         last_stock_list = set(stock_manager.get_active_stocks())
+        last_db_state = self._db_file_state(stock_manager.db_path)
         last_check_time = datetime.now()
         
         try:
@@ -235,7 +254,13 @@ class ProcessManager:
                 time.sleep(5)  # 每5秒检查一次
                 
                 try:
-                    current_stock_list = set(stock_manager.get_active_stocks())
+                    # 数据库文件（含WAL）未被修改时无需重新查询股票列表
+                    db_state = self._db_file_state(stock_manager.db_path)
+                    if db_state == last_db_state:
+                        current_stock_list = last_stock_list
+                    else:
+                        current_stock_list = set(stock_manager.get_active_stocks())
+                        last_db_state = db_state
                     
                     # 检查股票列表是否有变化
                     if current_stock_list != last_stock_list:
@@ -270,6 +295,24 @@ class ProcessManager:
         except KeyboardInterrupt:
             print("\n👋 停止自动重启监控")
     
+    @staticmethod
+    def _db_file_state(db_path) -> tuple:
+        """
+        获取数据库文件及其WAL文件的修改时间和大小
+        Args:
+            db_path: 数据库文件路径
+        Returns:
+            (修改时间, 大小) 元组，文件不存在时对应项为None
+        """
+        state = []
+        for path in (Path(db_path), Path(f"{db_path}-wal")):
+            try:
+                st = path.stat()
+                state.append((st.st_mtime_ns, st.st_size))
+            except OSError:
+                state.append(None)
+        return tuple(state)
+    
     def cleanup(self):
         """清理残留文件"""
         try:
@@ -11,30 +11,41 @@ class SignalDetector:
         self.price_threshold = PRICE_CHANGE_THRESHOLD
         self.volume_threshold = VOLUME_SPIKE_THRESHOLD
     
-    def detect_signals(self, current_data: Dict[str, Dict], historical_data: Dict[str, List] = None) -> Dict[str, List]:
+    def detect_signals(self, current_data: Dict[str, Dict], historical_data: Dict[str, List] = None,
+                       avg_volumes: Dict[str, float] = None) -> Dict[str, List]:
         """
         检测股票信号
         Args:
             current_data: 当前股票数据
             historical_data: 历史数据（可选）
+            avg_volumes: 预先计算好的平均成交量（可选，提供时优先于historical_data）
         Returns:
             检测到的信号字典
         """
         signals = {}
         
+        if avg_volumes is None:
+            historical_data = historical_data or {}
+            avg_volumes = {code: self._average_volume(historical_data.get(code, [])) for code in current_data}
+        
+        # 同一次检测的信号共用一个时间戳
+        now = datetime.now()
+        
         for code, data in current_data.items():
             stock_signals = []
             
             # 价格异动信号
-            price_signals = self._detect_price_signals(data)
+            price_signals = self._detect_price_signals(data.get('change_percent', 0), now)
             stock_signals.extend(price_signals)
             
             # 成交量异常信号
-            volume_signals = self._detect_volume_signals(data, historical_data.get(code, []) if historical_data else [])
+            volume_signals = self._detect_volume_signals(data.get('volume', 0), avg_volumes.get(code) or 0, now)
             stock_signals.extend(volume_signals)
             
             # 技术指标信号
-            technical_signals = self._detect_technical_signals(data)
+            technical_signals = self._detect_technical_signals(
+                data.get('current_price', 0), data.get('high_price', 0), data.get('low_price', 0), now
+            )
             stock_signals.extend(technical_signals)
             
             if stock_signals:
@@ -42,34 +53,37 @@ class SignalDetector:
                 
         return signals
     
-    def _detect_price_signals(self, data: Dict) -> List[Dict]:
-        """检测价格异动信号"""
+    @staticmethod
+    def _average_volume(historical_volumes: List) -> float:
+        """计算平均成交量（最后5条记录的平均，无历史数据时为0）"""
+        if not historical_volumes:
+            return 0.0
+        return sum(historical_volumes[-5:]) / min(len(historical_volumes), 5)
+    
+    def _detect_price_signals(self, change: float, now: datetime) -> List[Dict]:
+        """检测价格异动信号（change为涨跌幅%）"""
         signals = []
-        change_percent = abs(data.get('change_percent', 0))
+        change_percent = abs(change)
         
         if change_percent >= self.price_threshold:
-            signal_type = "涨停预警" if data.get('change_percent', 0) > 0 else "跌停预警"
+            signal_type = "涨停预警" if change > 0 else "跌停预警"
             signals.append({
                 'type': 'price_movement',
                 'level': 'high' if change_percent >= 8 else 'medium',
-                'message': f"{signal_type}: 涨跌幅{data.get('change_percent', 0):+.2f}%",
+                'message': f"{signal_type}: 涨跌幅{change:+.2f}%",
                 'value': change_percent,
-                'timestamp': datetime.now()
+                'timestamp': now
             })
         
         return signals
     
-    def _detect_volume_signals(self, data: Dict, historical_volumes: List) -> List[Dict]:
-        """检测成交量异常信号"""
+    def _detect_volume_signals(self, current_volume: float, avg_volume: float, now: datetime) -> List[Dict]:
+        """检测成交量异常信号（avg_volume为平均成交量，无历史数据时为0）"""
         signals = []
-        current_volume = data.get('volume', 0)
         
-        if not historical_volumes or current_volume == 0:
+        if current_volume == 0:
             return signals
         
-        # 计算平均成交量
-        avg_volume = sum(historical_volumes[-5:]) / min(len(historical_volumes), 5)
-        
         if avg_volume > 0 and current_volume > avg_volume * self.volume_threshold:
             ratio = current_volume / avg_volume
             signals.append({
@@ -77,19 +91,16 @@ class SignalDetector:
                 'level': 'high' if ratio >= 3 else 'medium',
                 'message': f"成交量异常: 是平均值的{ratio:.1f}倍",
                 'value': ratio,
-                'timestamp': datetime.now()
+                'timestamp': now
             })
         
         return signals
     
-    def _detect_technical_signals(self, data: Dict) -> List[Dict]:
+    def _detect_technical_signals(self, current_price: float, high_price: float, low_price: float,
+                                  now: datetime) -> List[Dict]:
         """检测技术指标信号"""
         signals = []
         
-        current_price = data.get('current_price', 0)
-        high_price = data.get('high_price', 0)
-        low_price = data.get('low_price', 0)
-        
         if current_price > 0 and high_price > 0 and low_price > 0:
             # 接近涨停
             if abs(current_price - high_price) / current_price < 0.01:
@@ -98,7 +109,7 @@ class SignalDetector:
                     'level': 'high',
                     'message': "接近今日最高价",
                     'value': (current_price - high_price) / current_price * 100,
-                    'timestamp': datetime.now()
+                    'timestamp': now
                 })
             
             # 接近跌停
@@ -108,7 +119,7 @@ class SignalDetector:
                     'level': 'high',
                     'message': "接近今日最低价",
                     'value': (current_price - low_price) / current_price * 100,
-                    'timestamp': datetime.now()
+                    'timestamp': now
                 })
         
         return signals
@@ -118,20 +129,19 @@ class SignalDetector:
         if not signals:
             return False
         
-        # 有高级别信号就通知
-        for code, stock_signals in signals.items():
-            for signal in stock_signals:
-                if signal.get('level') == 'high':
-                    return True
-        
-        # 或者有多个中级别信号
+        # 有高级别信号，或者有多个中级别信号就通知（单次遍历，满足条件即返回）
         medium_count = 0
-        for code, stock_signals in signals.items():
+        for stock_signals in signals.values():
             for signal in stock_signals:
-                if signal.get('level') == 'medium':
+                level = signal.get('level')
+                if level == 'high':
+                    return True
+                if level == 'medium':
                     medium_count += 1
+                    if medium_count >= 2:
+                        return True
         
-        return medium_count >= 2
+        return False
     
     def format_signals_for_notification(self, signals: Dict[str, List], stock_data: Dict[str, Dict]) -> str:
         """格式化信号为通知消息"""
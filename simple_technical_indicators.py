@@ -1,7 +1,71 @@
 import logging
-from typing import Dict, List, Optional
-from datetime import datetime
-import statistics
+from collections import deque
+from functools import lru_cache
+from itertools import accumulate
+from typing import Dict, List
+import numpy as np
+
+# 数据量低于该值时NumPy的调用开销超过收益，改用纯Python计算
+NUMPY_MIN_BARS = 128
+
+@lru_cache(maxsize=64)
+def _ema_weights(period: int, n: int) -> np.ndarray:
+    """
+    长度为n的EMA几何权重向量（只读，按 (周期, 长度) 在进程内缓存，跨实例复用）
+    
+    递推式 ema = price * a + ema * (1 - a) 展开后是收盘价与该权重的内积：
+    第一天的权重为 (1-a)^(n-1)，之后第k天为 a * (1-a)^(n-1-k)
+    """
+    multiplier = 2 / (period + 1)
+    weights = (1 - multiplier) ** np.arange(n - 1, -1, -1, dtype=np.float64)
+    weights[1:] *= multiplier
+    weights.flags.writeable = False
+    return weights
+
+def _summarize(rsi: float, macd_data: Dict, ma_data: Dict, volume_data: Dict,
+               volatility: float, current_price: float) -> Dict:
+    """根据各项指标生成信号汇总"""
+    # 生成信号
+    signals = {
+        'rsi_signal': 'neutral',
+        'macd_signal': 'neutral', 
+        'ma_signal': 'neutral',
+        'volume_signal': 'neutral'
+    }
+    
+    # RSI信号
+    if rsi < 30:
+        signals['rsi_signal'] = 'oversold'
+    elif rsi > 70:
+        signals['rsi_signal'] = 'overbought'
+    
+    # MACD信号
+    if macd_data['macd'] > macd_data['signal']:
+        signals['macd_signal'] = 'bullish'
+    elif macd_data['macd'] < macd_data['signal']:
+        signals['macd_signal'] = 'bearish'
+    
+    # 移动平均线信号
+    if current_price > ma_data['MA20']:
+        signals['ma_signal'] = 'bullish'
+    elif current_price < ma_data['MA20']:
+        signals['ma_signal'] = 'bearish'
+    
+    # 成交量信号
+    if volume_data['volume_ratio'] > 2:
+        signals['volume_signal'] = 'high'
+    elif volume_data['volume_ratio'] < 0.5:
+        signals['volume_signal'] = 'low'
+    
+    return {
+        'signals': signals,
+        'rsi': rsi,
+        'macd': macd_data,
+        'moving_averages': ma_data,
+        'volume': volume_data,
+        'volatility': volatility,
+        'current_price': current_price
+    }
 
 class SimpleTechnicalIndicators:
     """简化版技术指标计算器 - 不依赖pandas"""
@@ -16,6 +80,26 @@ class SimpleTechnicalIndicators:
         
         if not self.data:
             raise ValueError("历史数据不能为空")
+        
+        # 各列只提取一次（缺失字段按0处理，不在构造时抛出异常）；数据较多时用NumPy数组向量化计算，较少时用列表直接计算
+        n = len(self.data)
+        self.vectorized = n >= NUMPY_MIN_BARS
+        if self.vectorized:
+            self.closes = np.fromiter((item.get('close', 0) for item in self.data), dtype=np.float64, count=n)
+            self.volumes = np.fromiter((item.get('volume', 0) for item in self.data), dtype=np.float64, count=n)
+            
+            # 日涨跌额及日收益率（跳过前一日收盘价非正的数据），RSI与波动率共用
+            prev = self.closes[:-1]
+            valid = prev > 0
+            self.changes = np.diff(self.closes)
+            self.returns = self.changes[valid] / prev[valid]
+        else:
+            self.closes = [float(item.get('close', 0)) for item in self.data]
+            self.volumes = [float(item.get('volume', 0)) for item in self.data]
+            
+            pairs = list(zip(self.closes, self.closes[1:]))
+            self.changes = [cur - prev for prev, cur in pairs]
+            self.returns = [(cur - prev) / prev for prev, cur in pairs if prev > 0]
     
     def calculate_rsi(self, period: int = 14) -> float:
         """计算RSI指标"""
@@ -23,24 +107,15 @@ class SimpleTechnicalIndicators:
             if len(self.data) < period + 1:
                 return 50.0  # 默认中性值
             
-            gains = []
-            losses = []
-            
-            for i in range(1, len(self.data)):
-                change = self.data[i]['close'] - self.data[i-1]['close']
-                if change > 0:
-                    gains.append(change)
-                    losses.append(0)
-                else:
-                    gains.append(0)
-                    losses.append(abs(change))
-            
-            if len(gains) < period:
-                return 50.0
+            changes = self.changes[-period:]
             
             # 计算平均收益和平均损失
-            avg_gain = sum(gains[-period:]) / period
-            avg_loss = sum(losses[-period:]) / period
+            if self.vectorized:
+                avg_gain = float(np.maximum(changes, 0).sum()) / period
+                avg_loss = float(np.maximum(-changes, 0).sum()) / period
+            else:
+                avg_gain = sum(c for c in changes if c > 0) / period
+                avg_loss = -sum(c for c in changes if c < 0) / period
             
             if avg_loss == 0:
                 return 100.0
@@ -60,23 +135,8 @@ class SimpleTechnicalIndicators:
             if len(self.data) < slow_period:
                 return {'macd': 0, 'signal': 0, 'histogram': 0}
             
-            closes = [item['close'] for item in self.data]
-            
-            # 计算EMA
-            def calculate_ema(data, period):
-                if len(data) < period:
-                    return data[-1] if data else 0
-                
-                multiplier = 2 / (period + 1)
-                ema = data[0]  # 初始值
-                
-                for price in data[1:]:
-                    ema = (price * multiplier) + (ema * (1 - multiplier))
-                
-                return ema
-            
-            fast_ema = calculate_ema(closes, fast_period)
-            slow_ema = calculate_ema(closes, slow_period)
+            fast_ema = self._ema(fast_period)
+            slow_ema = self._ema(slow_period)
             
             macd = fast_ema - slow_ema
             
@@ -94,26 +154,46 @@ class SimpleTechnicalIndicators:
             self.logger.error(f"计算MACD失败: {e}")
             return {'macd': 0, 'signal': 0, 'histogram': 0}
     
+    def _ema(self, period: int) -> float:
+        """
+        计算收盘价的EMA（以第一天收盘价为初始值）
+        
+        Args:
+            period: EMA周期
+        Returns:
+            最后一天的EMA值，数据不足period天时返回最新收盘价
+        """
+        closes = self.closes
+        n = len(closes)
+        if n < period:
+            return float(closes[-1])
+        
+        multiplier = 2 / (period + 1)
+        if not self.vectorized:
+            ema = closes[0]  # 初始值
+            for price in closes[1:]:
+                ema = (price * multiplier) + (ema * (1 - multiplier))
+            return ema
+        
+        return float(np.dot(_ema_weights(period, n), closes))
+    
     def calculate_moving_averages(self) -> Dict:
         """计算移动平均线"""
         try:
-            closes = [item['close'] for item in self.data]
+            # 对最近60天收盘价做一次倒序累加，tail_sums[k-1] 即最近k天之和
+            tail = self.closes[-60:][::-1]
+            tail_sums = np.cumsum(tail) if self.vectorized else list(accumulate(tail))
             
-            def calculate_ma(data, period):
-                if len(data) < period:
-                    return sum(data) / len(data) if data else 0
-                return sum(data[-period:]) / period
-            
-            ma5 = calculate_ma(closes, 5)
-            ma10 = calculate_ma(closes, 10)
-            ma20 = calculate_ma(closes, 20)
-            ma60 = calculate_ma(closes, 60)
+            def calculate_ma(period):
+                # 数据不足period天时使用全部数据的均值
+                count = min(period, len(tail_sums))
+                return float(tail_sums[count - 1]) / count
             
             return {
-                'MA5': ma5,
-                'MA10': ma10,
-                'MA20': ma20,
-                'MA60': ma60
+                'MA5': calculate_ma(5),
+                'MA10': calculate_ma(10),
+                'MA20': calculate_ma(20),
+                'MA60': calculate_ma(60)
             }
             
         except Exception as e:
@@ -123,13 +203,17 @@ class SimpleTechnicalIndicators:
     def calculate_volume_indicators(self) -> Dict:
         """计算成交量指标"""
         try:
-            volumes = [item['volume'] for item in self.data]
+            volumes = self.volumes
             
             # 20日平均成交量
-            avg_volume_20 = sum(volumes[-20:]) / min(20, len(volumes)) if volumes else 0
+            recent_volumes = volumes[-20:]
+            if self.vectorized:
+                avg_volume_20 = float(recent_volumes.mean())
+            else:
+                avg_volume_20 = sum(recent_volumes) / len(recent_volumes)
             
             # 当日成交量与平均值比较
-            current_volume = volumes[-1] if volumes else 0
+            current_volume = float(volumes[-1])
             volume_ratio = current_volume / avg_volume_20 if avg_volume_20 > 0 else 1
             
             return {
@@ -148,23 +232,18 @@ class SimpleTechnicalIndicators:
             if len(self.data) < 2:
                 return 0.0
             
-            # 计算日收益率
-            returns = []
-            for i in range(1, len(self.data)):
-                if self.data[i-1]['close'] > 0:
-                    daily_return = (self.data[i]['close'] - self.data[i-1]['close']) / self.data[i-1]['close']
-                    returns.append(daily_return)
-            
+            returns = self.returns
             if len(returns) < 2:
                 return 0.0
             
-            # 使用最近period天的数据计算波动率
-            recent_returns = returns[-period:] if len(returns) >= period else returns
-            
-            # 计算标准差
-            mean_return = sum(recent_returns) / len(recent_returns)
-            variance = sum((r - mean_return) ** 2 for r in recent_returns) / len(recent_returns)
-            volatility = (variance ** 0.5) * (252 ** 0.5) * 100  # 年化波动率(%)
+            # 使用最近period天的数据计算波动率（总体标准差）
+            recent_returns = returns[-period:]
+            if self.vectorized:
+                std = float(recent_returns.std())
+            else:
+                mean_return = sum(recent_returns) / len(recent_returns)
+                std = (sum((r - mean_return) ** 2 for r in recent_returns) / len(recent_returns)) ** 0.5
+            volatility = std * (252 ** 0.5) * 100  # 年化波动率(%)
             
             return volatility
             
@@ -181,50 +260,204 @@ class SimpleTechnicalIndicators:
             volume_data = self.calculate_volume_indicators()
             volatility = self.calculate_volatility()
             
-            current_price = self.data[-1]['close'] if self.data else 0
+            current_price = float(self.closes[-1])
             
-            # 生成信号
-            signals = {
-                'rsi_signal': 'neutral',
-                'macd_signal': 'neutral', 
-                'ma_signal': 'neutral',
-                'volume_signal': 'neutral'
-            }
-            
-            # RSI信号
-            if rsi < 30:
-                signals['rsi_signal'] = 'oversold'
-            elif rsi > 70:
-                signals['rsi_signal'] = 'overbought'
-            
-            # MACD信号
-            if macd_data['macd'] > macd_data['signal']:
-                signals['macd_signal'] = 'bullish'
-            elif macd_data['macd'] < macd_data['signal']:
-                signals['macd_signal'] = 'bearish'
-            
-            # 移动平均线信号
-            if current_price > ma_data['MA20']:
-                signals['ma_signal'] = 'bullish'
-            elif current_price < ma_data['MA20']:
-                signals['ma_signal'] = 'bearish'
-            
-            # 成交量信号
-            if volume_data['volume_ratio'] > 2:
-                signals['volume_signal'] = 'high'
-            elif volume_data['volume_ratio'] < 0.5:
-                signals['volume_signal'] = 'low'
-            
-            return {
-                'signals': signals,
-                'rsi': rsi,
-                'macd': macd_data,
-                'moving_averages': ma_data,
-                'volume': volume_data,
-                'volatility': volatility,
-                'current_price': current_price
-            }
+            return _summarize(rsi, macd_data, ma_data, volume_data, volatility, current_price)
             
         except Exception as e:
             self.logger.error(f"生成信号汇总失败: {e}")
-            return {}
\ No newline at end of file
+            return {}
+
+class IncrementalIndicators:
+    """增量技术指标计算器 - 用历史数据初始化状态后逐根K线更新，每次更新 O(1)"""
+    
+    MA_PERIODS = (5, 10, 20, 60)
+    VOLUME_PERIOD = 20
+    
+    def __init__(self, rsi_period: int = 14, fast_period: int = 12, slow_period: int = 26,
+                 volatility_period: int = 20):
+        """
+        Args:
+            rsi_period: RSI周期
+            fast_period: MACD快线EMA周期
+            slow_period: MACD慢线EMA周期
+            volatility_period: 波动率统计天数
+        """
+        self.logger = logging.getLogger(__name__)
+        self.rsi_period = rsi_period
+        self.fast_period = fast_period
+        self.slow_period = slow_period
+        
+        self.count = 0
+        self.last_close = 0.0
+        self.last_volume = 0.0
+        self.ema_fast = 0.0
+        self.ema_slow = 0.0
+        
+        # 各窗口保存最近的数据，配合滚动和（移出最旧、加入最新）维护均值
+        self._gains = deque(maxlen=rsi_period)
+        self._losses = deque(maxlen=rsi_period)
+        self._gain_sum = 0.0
+        self._loss_sum = 0.0
+        self._ma_windows = {p: deque(maxlen=p) for p in self.MA_PERIODS}
+        self._ma_sums = dict.fromkeys(self.MA_PERIODS, 0.0)
+        self._volumes = deque(maxlen=self.VOLUME_PERIOD)
+        self._volume_sum = 0.0
+        self._returns = deque(maxlen=volatility_period)
+    
+    @classmethod
+    def from_history(cls, historical_data: List[Dict], **kwargs) -> 'IncrementalIndicators':
+        """
+        用历史数据初始化（向量化计算初始状态）
+        Args:
+            historical_data: 历史数据列表，每个元素包含close, volume等
+            **kwargs: 传给构造函数的指标周期参数
+        Returns:
+            初始化完成的增量计算器
+        """
+        batch = SimpleTechnicalIndicators(historical_data)
+        indicators = cls(**kwargs)
+        indicators._seed(batch)
+        return indicators
+    
+    def _seed(self, batch: SimpleTechnicalIndicators):
+        """从批量计算器的列数组初始化全部状态"""
+        closes, volumes, changes = np.asarray(batch.closes), np.asarray(batch.volumes), np.asarray(batch.changes)
+        self.count = len(closes)
+        self.last_close = float(closes[-1])
+        self.last_volume = float(volumes[-1])
+        self.ema_fast = self._ema_state(closes, self.fast_period)
+        self.ema_slow = self._ema_state(closes, self.slow_period)
+        
+        recent = changes[-self.rsi_period:] if self.rsi_period else changes[:0]
+        self._gains.extend(np.maximum(recent, 0).tolist())
+        self._losses.extend(np.maximum(-recent, 0).tolist())
+        self._gain_sum = sum(self._gains)
+        self._loss_sum = sum(self._losses)
+        
+        for period, window in self._ma_windows.items():
+            window.extend(closes[-period:].tolist())
+            self._ma_sums[period] = sum(window)
+        
+        self._volumes.extend(volumes[-self.VOLUME_PERIOD:].tolist())
+        self._volume_sum = sum(self._volumes)
+        
+        self._returns.extend(np.asarray(batch.returns)[-self._returns.maxlen:].tolist())
+    
+    @staticmethod
+    def _ema_state(closes: np.ndarray, period: int) -> float:
+        """以第一天收盘价为初始值递推到最后一天的EMA状态"""
+        return float(np.dot(_ema_weights(period, len(closes)), closes))
+    
+    def push(self, bar: Dict) -> Dict:
+        """
+        追加一根新K线并返回最新的信号汇总
+        Args:
+            bar: K线数据，包含close和volume
+        Returns:
+            与 SimpleTechnicalIndicators.get_signals_summary 结构相同的信号汇总
+        """
+        try:
+            self._update(float(bar['close']), float(bar['volume']))
+        except Exception as e:
+            self.logger.error(f"更新技术指标失败: {e}")
+            return {}
+        return self.get_signals_summary()
+    
+    def _update(self, close: float, volume: float):
+        """用一根K线更新全部状态"""
+        if self.count == 0:
+            self.ema_fast = self.ema_slow = close
+        else:
+            prev = self.last_close
+            change = close - prev
+            gain, loss = (change, 0.0) if change > 0 else (0.0, -change)
+            if len(self._gains) == self._gains.maxlen:
+                self._gain_sum -= self._gains[0]
+                self._loss_sum -= self._losses[0]
+            self._gains.append(gain)
+            self._losses.append(loss)
+            self._gain_sum += gain
+            self._loss_sum += loss
+            
+            fast_mult = 2 / (self.fast_period + 1)
+            slow_mult = 2 / (self.slow_period + 1)
+            self.ema_fast = close * fast_mult + self.ema_fast * (1 - fast_mult)
+            self.ema_slow = close * slow_mult + self.ema_slow * (1 - slow_mult)
+            
+            if prev > 0:
+                self._returns.append(change / prev)
+        
+        for period, window in self._ma_windows.items():
+            if len(window) == period:
+                self._ma_sums[period] -= window[0]
+            window.append(close)
+            self._ma_sums[period] += close
+        
+        if len(self._volumes) == self.VOLUME_PERIOD:
+            self._volume_sum -= self._volumes[0]
+        self._volumes.append(volume)
+        self._volume_sum += volume
+        
+        self.last_close = close
+        self.last_volume = volume
+        self.count += 1
+    
+    def calculate_rsi(self) -> float:
+        """计算RSI指标"""
+        if self.count < self.rsi_period + 1:
+            return 50.0  # 默认中性值
+        
+        avg_gain = self._gain_sum / self.rsi_period
+        avg_loss = self._loss_sum / self.rsi_period
+        if avg_loss <= 0:
+            return 100.0
+        
+        return 100 - (100 / (1 + avg_gain / avg_loss))
+    
+    def calculate_macd(self) -> Dict:
+        """计算MACD指标"""
+        if self.count < self.slow_period:
+            return {'macd': 0, 'signal': 0, 'histogram': 0}
+        
+        fast_ema = self.ema_fast if self.count >= self.fast_period else self.last_close
+        macd = fast_ema - self.ema_slow
+        
+        # 简化的signal计算
+        signal = macd * 0.8
+        return {'macd': macd, 'signal': signal, 'histogram': macd - signal}
+    
+    def calculate_moving_averages(self) -> Dict:
+        """计算移动平均线"""
+        return {f'MA{p}': self._ma_sums[p] / len(self._ma_windows[p]) for p in self.MA_PERIODS}
+    
+    def calculate_volume_indicators(self) -> Dict:
+        """计算成交量指标"""
+        avg_volume_20 = self._volume_sum / len(self._volumes)
+        return {
+            'avg_volume_20': avg_volume_20,
+            'current_volume': self.last_volume,
+            'volume_ratio': self.last_volume / avg_volume_20 if avg_volume_20 > 0 else 1
+        }
+    
+    def calculate_volatility(self) -> float:
+        """计算波动率"""
+        n = len(self._returns)
+        if n < 2:
+            return 0.0
+        
+        mean_return = sum(self._returns) / n
+        variance = sum((r - mean_return) ** 2 for r in self._returns) / n
+        return (variance ** 0.5) * (252 ** 0.5) * 100  # 年化波动率(%)
+    
+    def get_signals_summary(self) -> Dict:
+        """获取技术指标信号汇总"""
+        if self.count == 0:
+            return {}
+        
+        try:
+            return _summarize(self.calculate_rsi(), self.calculate_macd(), self.calculate_moving_averages(),
+                              self.calculate_volume_indicators(), self.calculate_volatility(), self.last_close)
+        except Exception as e:
+            self.logger.error(f"生成信号汇总失败: {e}")
+            return {}
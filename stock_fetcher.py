@@ -3,16 +3,188 @@ import re
 import logging
 import json
 import time
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Dict, List, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# 并发获取行情的最大线程数（同时也是连接池大小）
+MAX_FETCH_WORKERS = 16
+
+# 腾讯行情接口单次批量查询的最大代码数
+TENCENT_BATCH_SIZE = 50
+
+# 批量行情响应中逐只提取 (腾讯代码, 数据) 的正则，模块加载时编译一次
+_TENCENT_BATCH_RE = re.compile(r'v_([^=\s]+)="([^"]*)"')
+
+# 接口限流/服务端临时错误时自动重试的HTTP状态码
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# 腾讯行情只需拆出前50个字段：用到的字段都在其中，股票数据的完整性校验也只要求至少50个字段
+_TENCENT_MAX_SPLIT = 49
+
+# 新浪行情只需拆出前9个字段（名称、开盘、昨收、当前、最高、最低及成交量）
+_SINA_MAX_SPLIT = 9
+
+# A股指数代码 -> 腾讯接口代码
+A_INDEX_SYMBOLS = {
+    '000300.SS': 'sh000300',
+    'sh000300': 'sh000300',
+    '000905.SS': 'sh000905',
+    'sh000905': 'sh000905',
+    '000016.SS': 'sh000016',
+    'sh000016': 'sh000016',
+}
+
+# A股指数名称（按腾讯接口代码）
+A_INDEX_NAMES = {
+    'sh000300': '沪深300',
+    'sh000905': '中证500',
+    'sh000016': '上证50',
+}
+
+# 港股指数代码 -> 腾讯接口代码
+HK_INDEX_SYMBOLS = {
+    'HSI': 'hkHSI',
+    'hk.HSI': 'hkHSI',
+}
+
+# 港股指数名称
+HK_INDEX_NAMES = {
+    'HSI': '恒生指数',
+    'hk.HSI': '恒生指数',
+}
+
+# 指数代码 -> 指数名称（名称固定，无需请求接口）
+_INDEX_NAMES = {
+    **{code: A_INDEX_NAMES[symbol] for code, symbol in A_INDEX_SYMBOLS.items() if symbol in A_INDEX_NAMES},
+    **HK_INDEX_NAMES,
+}
+
+@dataclass(frozen=True)
+class _TencentSchema:
+    """腾讯行情字段的解析方式（按代码类型区分）"""
+    market: str
+    currency: str
+    min_parts: int                   # 有效数据至少包含的字段数
+    volume_scale: Optional[int]      # 成交量换算倍数，None 表示指数（无成交量，名称使用固定映射）
+
+_TENCENT_SCHEMAS = {
+    'a': _TencentSchema('A股', '¥', 50, 100),   # 腾讯API返回的是手数，需要乘以100
+    'hk': _TencentSchema('港股', 'HK$', 50, 1),
+    'a_index': _TencentSchema('A股指数', '点', 10, None),
+    'hk_index': _TencentSchema('港股指数', '点', 10, None),
+}
+
+@dataclass(frozen=True, eq=False)
+class Quote(Mapping):
+    """
+    单只股票/指数的实时行情
+    不可变的紧凑记录（__slots__，无逐条字典开销），同时实现只读Mapping接口，
+    按字典读取行情的调用方（data['name']、data.get('market')、items()）无需改动
+    """
+    code: str
+    name: str
+    current_price: float
+    open_price: float
+    high_price: float
+    low_price: float
+    prev_close: float
+    change: float
+    change_percent: float
+    volume: int
+    market: str
+    currency: str
+    
+    # 手动声明 __slots__（dataclass 的 slots 参数需要 Python 3.10+）
+    __slots__ = tuple(__annotations__)
+    
+    def __getitem__(self, key: str):
+        if key in _QUOTE_KEYS:
+            return getattr(self, key)
+        raise KeyError(key)
+    
+    def __iter__(self):
+        return iter(self.__slots__)
+    
+    def __len__(self) -> int:
+        return len(self.__slots__)
+
+_QUOTE_KEYS = frozenset(Quote.__slots__)
+
+def _quoted(text: str) -> Optional[str]:
+    """提取行情响应中第一对双引号内的数据部分（用 str.find 定位，不经过正则）"""
+    start = text.find('"')
+    if start < 0:
+        return None
+    end = text.find('"', start + 1)
+    if end < 0:
+        return None
+    return text[start + 1:end]
+
+@lru_cache(maxsize=4096)
+def _route(code: str) -> Tuple[str, str]:
+    """
+    确定代码的类型及腾讯接口代码（结果按代码缓存，重复查询同一批代码时无需再判断）
+    Args:
+        code: 股票代码
+    Returns:
+        (类型, 腾讯接口代码)，类型为 'hk_index'、'hk'、'a_index' 或 'a'
+    """
+    if code in HK_INDEX_SYMBOLS:
+        return 'hk_index', HK_INDEX_SYMBOLS[code]
+    if len(code) == 5 and code.isdigit():
+        return 'hk', f"hk{code}"
+    if code in A_INDEX_SYMBOLS:
+        return 'a_index', A_INDEX_SYMBOLS[code]
+    market_prefix = "sh" if code.startswith("6") else "sz"
+    return 'a', f"{market_prefix}{code}"
 
 class StockFetcher:
     """股票数据获取器"""
     
-    def __init__(self):
+    def __init__(self, ttl: float = 1.0):
+        """
+        Args:
+            ttl: 行情缓存有效期（秒），有效期内重复查询同一代码不再请求接口
+        """
         self.logger = logging.getLogger(__name__)
+        
+        # 行情缓存 {代码: (获取时间, 行情数据)}；名称不会变化，缓存不过期
+        self.ttl = ttl
+        self._quote_cache: Dict[str, Tuple[float, Dict]] = {}
+        self._name_cache: Dict[str, str] = dict(_INDEX_NAMES)
+        
+        # 复用同一个Session，保持长连接
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=MAX_FETCH_WORKERS,
+            pool_maxsize=MAX_FETCH_WORKERS,
+            max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=RETRY_STATUS_CODES)
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        
+        # 所有行情请求共用的请求头：统一的User-Agent，显式声明压缩和长连接
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+        })
+        
+        # 按代码类型分派单只行情请求
+        self._fetchers = {
+            'hk_index': self._fetch_hk_index,
+            'hk': self._fetch_hk_stock,
+            'a_index': self._fetch_a_stock_index,
+            'a': self._fetch_a_stock,
+        }
     
-    def get_stock_data(self, stock_codes: List[str]) -> Dict[str, Dict]:
+    def get_stock_data(self, stock_codes: List[str]) -> Dict[str, Quote]:
         """
         获取股票数据
         Args:
@@ -21,27 +193,81 @@ class StockFetcher:
             股票数据字典
         """
         results = {}
+        if not stock_codes:
+            return results
         
+        # 缓存有效期内的行情直接复用
+        now = time.monotonic()
+        fetched = {}
         for code in stock_codes:
-            try:
-                if self._is_hk_stock(code):
-                    if self._is_hk_index(code):
-                        data = self._fetch_hk_index(code)
-                    else:
-                        data = self._fetch_hk_stock(code)
-                elif self._is_a_stock_index(code):
-                    data = self._fetch_a_stock_index(code)
-                else:
-                    data = self._fetch_a_stock(code)
-                
+            entry = self._quote_cache.get(code)
+            if entry is not None and now - entry[0] < self.ttl:
+                fetched[code] = entry[1]
+        
+        pending = [code for code in stock_codes if code not in fetched]
+        if pending:
+            fresh = self._fetch_quotes(pending)
+            fetched.update(fresh)
+            
+            fetched_at = time.monotonic()
+            for code, data in fresh.items():
                 if data:
-                    results[code] = data
-                    
-            except Exception as e:
-                self.logger.error(f"获取股票/指数 {code} 数据失败: {e}")
+                    self._quote_cache[code] = (fetched_at, data)
+                    if data.get('name'):
+                        self._name_cache[code] = data['name']
+        
+        # 按输入顺序收集结果
+        for code in stock_codes:
+            data = fetched.get(code)
+            if data:
+                results[code] = data
                 
         return results
     
+    def _fetch_quotes(self, stock_codes: List[str]) -> Dict[str, Optional[Quote]]:
+        """
+        从接口获取行情（不使用缓存）
+        Args:
+            stock_codes: 股票代码列表
+        Returns:
+            {股票代码: 行情数据}，获取失败的代码对应None或不包含在内
+        """
+        # 所有代码合并为一次（超过批量上限时分批）腾讯行情请求
+        symbols = {code: _route(code)[1] for code in stock_codes}
+        quotes = self._fetch_tencent_batch(list(dict.fromkeys(symbols.values())))
+        
+        fetched = {}
+        for code, symbol in symbols.items():
+            parts = quotes.get(symbol)
+            if parts:
+                fetched[code] = self._quote_from_parts(code, symbol, parts)
+        
+        # 批量结果中缺失的代码，退回逐个并发请求（批量请求整体失败时多半是网络问题，不再重试）
+        missing = [code for code in symbols if code not in fetched] if quotes else []
+        if missing:
+            max_workers = min(MAX_FETCH_WORKERS, len(missing))
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                fetched.update(zip(missing, executor.map(self._fetch_one, missing)))
+        
+        return fetched
+    
+    def _quote_from_parts(self, code: str, symbol: str, parts: List[str]) -> Optional[Quote]:
+        """按代码类型将批量行情字段解析为股票/指数数据"""
+        kind = _route(code)[0]
+        if kind == 'hk_index':
+            return self._parse_tencent_fields(parts, code, kind, HK_INDEX_NAMES.get(code, '未知指数'))
+        elif kind == 'a_index':
+            return self._parse_tencent_fields(parts, code, kind, A_INDEX_NAMES.get(symbol, '未知指数'))
+        return self._parse_tencent_fields(parts, code, kind)
+    
+    def _fetch_one(self, code: str) -> Optional[Quote]:
+        """获取单只股票/指数数据"""
+        try:
+            return self._fetchers[_route(code)[0]](code)
+        except Exception as e:
+            self.logger.error(f"获取股票/指数 {code} 数据失败: {e}")
+            return None
+    
     def get_stock_name(self, code: str) -> Optional[str]:
         """
         获取股票名称
@@ -50,16 +276,13 @@ class StockFetcher:
         Returns:
             股票名称，获取失败返回None
         """
+        cached = self._name_cache.get(code)
+        if cached:
+            return cached
+        
         try:
-            if self._is_hk_stock(code):
-                if self._is_hk_index(code):
-                    data = self._fetch_hk_index(code)
-                else:
-                    data = self._fetch_hk_stock(code)
-            elif self._is_a_stock_index(code):
-                data = self._fetch_a_stock_index(code)
-            else:
-                data = self._fetch_a_stock(code)
+            # 走get_stock_data，命中行情缓存时无需再请求接口，成功后名称缓存也会一并更新
+            data = self.get_stock_data([code]).get(code)
             
             if data and data.get('name'):
                 self.logger.info(f"成功获取股票/指数名称: {code} -> {data['name']}")
@@ -72,30 +295,84 @@ class StockFetcher:
             self.logger.error(f"获取股票/指数 {code} 名称失败: {e}")
             return None
     
-    def _is_hk_stock(self, code: str) -> bool:
-        """判断是否为港股（包括股票和指数）"""
-        # 港股股票：5位数字
-        if len(code) == 5 and code.isdigit():
-            return True
+    def get_stock_names_batch(self, codes: List[str]) -> Dict[str, str]:
+        """
+        批量获取股票名称（腾讯接口一次请求查询多个代码）
+        Args:
+            codes: 股票代码列表
+        Returns:
+            {股票代码: 股票名称} 字典，获取失败的代码不包含在内
+        """
+        names = {code: self._name_cache[code] for code in codes if code in self._name_cache}
+        symbols = {}
+        for code in codes:
+            if code not in names:
+                symbols.setdefault(_route(code)[1], []).append(code)
         
-        # 港股指数
-        hk_indices = {'HSI', 'hk.HSI'}
-        return code in hk_indices
+        for symbol, parts in self._fetch_tencent_batch(list(symbols)).items():
+            for code in symbols.get(symbol, []):
+                # 指数名称使用固定映射，股票名称取接口返回值
+                kind = _route(code)[0]
+                if kind == 'hk_index':
+                    name = HK_INDEX_NAMES.get(code, '未知指数') if len(parts) >= 10 else None
+                elif kind == 'a_index':
+                    name = A_INDEX_NAMES.get(symbol, '未知指数') if len(parts) >= 10 else None
+                else:
+                    name = parts[1] if len(parts) >= 50 else None
+                
+                if name:
+                    names[code] = name
+                    self._name_cache[code] = name
+        
+        missing = len(codes) - len(names)
+        if missing:
+            self.logger.warning(f"批量获取名称: {missing} 只股票/指数未能获取到名称")
+        return names
     
-    def _is_a_stock_index(self, code: str) -> bool:
-        """判断是否为A股指数"""
-        a_stock_indices = {
-            '000300.SS', '000905.SS', '000016.SS',
-            'sh000300', 'sh000905', 'sh000016'
-        }
-        return code in a_stock_indices
+    def _fetch_tencent_batch(self, symbols: List[str]) -> Dict[str, List[str]]:
+        """
+        批量请求腾讯行情接口
+        Args:
+            symbols: 腾讯接口代码列表，如 ['sh600000', 'hk00700']
+        Returns:
+            {腾讯代码: 按'~'拆分后的字段列表}
+        """
+        results = {}
+        chunks = [symbols[i:i + TENCENT_BATCH_SIZE] for i in range(0, len(symbols), TENCENT_BATCH_SIZE)]
+        
+        # 代码较多需要分批时，各批次并发请求
+        if len(chunks) > 1:
+            with ThreadPoolExecutor(max_workers=min(MAX_FETCH_WORKERS, len(chunks))) as executor:
+                for quotes in executor.map(self._fetch_tencent_chunk, chunks):
+                    results.update(quotes)
+        elif chunks:
+            results = self._fetch_tencent_chunk(chunks[0])
+        
+        return results
     
-    def _is_hk_index(self, code: str) -> bool:
-        """判断是否为港股指数"""
-        hk_indices = {'HSI', 'hk.HSI'}
-        return code in hk_indices
+    def _fetch_tencent_chunk(self, chunk: List[str]) -> Dict[str, List[str]]:
+        """请求一批腾讯行情（不超过 TENCENT_BATCH_SIZE 个代码）"""
+        results = {}
+        
+        try:
+            url = f"https://qt.gtimg.cn/q={','.join(chunk)}"
+            response = self.session.get(url, timeout=10)
+            response.encoding = 'gbk'
+            
+            if response.status_code != 200:
+                self.logger.error(f"批量请求腾讯行情失败: {response.status_code}")
+                return results
+            
+            # 响应格式: v_sh600000="1~浦发银行~600000~...";
+            for symbol, payload in _TENCENT_BATCH_RE.findall(response.text):
+                results[symbol] = payload.split('~', _TENCENT_MAX_SPLIT)
+                
+        except Exception as e:
+            self.logger.error(f"批量请求腾讯行情失败: {e}")
+        
+        return results
     
-    def _fetch_a_stock(self, code: str) -> Optional[Dict]:
+    def _fetch_a_stock(self, code: str) -> Optional[Quote]:
         """获取A股数据"""
         try:
             # 尝试腾讯财经API
@@ -103,11 +380,7 @@ class StockFetcher:
             tencent_code = f"{market_prefix}{code}"
             url = f"https://qt.gtimg.cn/q={tencent_code}"
             
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            
-            response = requests.get(url, headers=headers, timeout=10)
+            response = self.session.get(url, timeout=10)
             response.encoding = 'gbk'
             
             if response.status_code == 200 and response.text:
@@ -118,13 +391,13 @@ class StockFetcher:
             
         return None
     
-    def _fetch_hk_stock(self, code: str) -> Optional[Dict]:
+    def _fetch_hk_stock(self, code: str) -> Optional[Quote]:
         """获取港股数据"""
         try:
             # 腾讯财经API
             hk_code = f"hk{code}"
             url = f"https://qt.gtimg.cn/q={hk_code}"
-            response = requests.get(url, timeout=10)
+            response = self.session.get(url, timeout=10)
             response.encoding = 'gbk'
             
             if response.status_code == 200:
@@ -135,285 +408,153 @@ class StockFetcher:
             
         return None
     
-    def _parse_sina_a_stock(self, text: str, code: str) -> Optional[Dict]:
+    def _parse_sina_a_stock(self, text: str, code: str) -> Optional[Quote]:
         """解析新浪A股数据"""
         try:
             # 提取数据部分
-            match = re.search(r'"([^"]*)"', text)
-            if not match:
+            data_str = _quoted(text)
+            if data_str is None:
                 return None
                 
-            data_str = match.group(1)
-            parts = data_str.split(',')
-            
-            if len(parts) < 32:
+            # 完整性校验要求至少32个字段，用逗号计数判断，只拆出用到的前9个字段
+            if data_str.count(',') < 31:
                 return None
             
+            parts = data_str.split(',', _SINA_MAX_SPLIT)
             name = parts[0]
-            current_price = float(parts[3]) if parts[3] else 0
-            prev_close = float(parts[2]) if parts[2] else 0
-            open_price = float(parts[1]) if parts[1] else 0
-            high_price = float(parts[4]) if parts[4] else 0
-            low_price = float(parts[5]) if parts[5] else 0
+            # 字段1~5依次为：开盘价、昨收价、当前价、最高价、最低价，空值按0处理
+            open_price, prev_close, current_price, high_price, low_price = [float(x or 0) for x in parts[1:6]]
             volume = int(float(parts[8])) if parts[8] else 0
             
             change = current_price - prev_close
             change_percent = (change / prev_close * 100) if prev_close > 0 else 0
             
-            return {
-                'code': code,
-                'name': name,
-                'current_price': current_price,
-                'open_price': open_price,
-                'high_price': high_price,
-                'low_price': low_price,
-                'prev_close': prev_close,
-                'change': change,
-                'change_percent': change_percent,
-                'volume': volume,
-                'market': 'A股',
-                'currency': '¥'
-            }
+            return Quote(
+                code=code,
+                name=name,
+                current_price=current_price,
+                open_price=open_price,
+                high_price=high_price,
+                low_price=low_price,
+                prev_close=prev_close,
+                change=change,
+                change_percent=change_percent,
+                volume=volume,
+                market='A股',
+                currency='¥'
+            )
             
         except Exception as e:
             self.logger.error(f"解析A股 {code} 数据失败: {e}")
             return None
     
-    def _fetch_a_stock_index(self, code: str) -> Optional[Dict]:
+    def _fetch_a_stock_index(self, code: str) -> Optional[Quote]:
         """获取A股指数数据"""
         try:
-            # 指数代码映射
-            index_mapping = {
-                '000300.SS': 'sh000300',
-                'sh000300': 'sh000300',
-                '000905.SS': 'sh000905',
-                'sh000905': 'sh000905',
-                '000016.SS': 'sh000016',
-                'sh000016': 'sh000016',
-            }
-            
-            # 指数名称映射
-            index_names = {
-                'sh000300': '沪深300',
-                'sh000905': '中证500',
-                'sh000016': '上证50',
-            }
-            
-            tencent_code = index_mapping.get(code, code)
+            tencent_code = A_INDEX_SYMBOLS.get(code, code)
             url = f"https://qt.gtimg.cn/q={tencent_code}"
             
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-            }
-            
-            response = requests.get(url, headers=headers, timeout=10)
+            response = self.session.get(url, timeout=10)
             response.encoding = 'gbk'
             
             if response.status_code == 200 and response.text:
-                return self._parse_tencent_a_index(response.text, code, index_names.get(tencent_code, '未知指数'))
+                return self._parse_tencent_a_index(response.text, code, A_INDEX_NAMES.get(tencent_code, '未知指数'))
                 
         except Exception as e:
             self.logger.error(f"获取A股指数 {code} 数据失败: {e}")
             
         return None
     
-    def _fetch_hk_index(self, code: str) -> Optional[Dict]:
+    def _fetch_hk_index(self, code: str) -> Optional[Quote]:
         """获取港股指数数据"""
         try:
-            # 指数代码映射
-            index_mapping = {
-                'HSI': 'hkHSI',
-                'hk.HSI': 'hkHSI',
-            }
-            
-            # 指数名称映射
-            index_names = {
-                'HSI': '恒生指数',
-                'hk.HSI': '恒生指数',
-            }
-            
-            tencent_code = index_mapping.get(code, f"hk{code}")
+            tencent_code = HK_INDEX_SYMBOLS.get(code, f"hk{code}")
             url = f"https://qt.gtimg.cn/q={tencent_code}"
             
-            response = requests.get(url, timeout=10)
+            response = self.session.get(url, timeout=10)
             response.encoding = 'gbk'
             
             if response.status_code == 200:
-                return self._parse_tencent_hk_index(response.text, code, index_names.get(code, '未知指数'))
+                return self._parse_tencent_hk_index(response.text, code, HK_INDEX_NAMES.get(code, '未知指数'))
                 
         except Exception as e:
             self.logger.error(f"获取港股指数 {code} 数据失败: {e}")
             
         return None
     
-    def _parse_tencent_a_index(self, text: str, code: str, name: str) -> Optional[Dict]:
+    @staticmethod
+    def _extract_tencent_parts(text: str) -> Optional[List[str]]:
+        """提取腾讯接口响应中引号内的数据，并按'~'拆分为字段列表"""
+        data_str = _quoted(text)
+        return data_str.split('~', _TENCENT_MAX_SPLIT) if data_str is not None else None
+    
+    def _parse_tencent_a_index(self, text: str, code: str, name: str) -> Optional[Quote]:
         """解析腾讯A股指数数据"""
-        try:
-            # 提取数据部分
-            match = re.search(r'"([^"]*)"', text)
-            if not match:
-                return None
-                
-            data_str = match.group(1)
-            parts = data_str.split('~')
-            
-            if len(parts) < 10:
-                return None
-            
-            current_price = float(parts[3]) if parts[3] else 0
-            prev_close = float(parts[4]) if parts[4] else 0
-            open_price = float(parts[5]) if parts[5] else 0
-            high_price = float(parts[33]) if len(parts) > 33 and parts[33] else current_price
-            low_price = float(parts[34]) if len(parts) > 34 and parts[34] else current_price
-            
-            change = current_price - prev_close
-            change_percent = (change / prev_close * 100) if prev_close > 0 else 0
-            
-            return {
-                'code': code,
-                'name': name,
-                'current_price': current_price,
-                'open_price': open_price,
-                'high_price': high_price,
-                'low_price': low_price,
-                'prev_close': prev_close,
-                'change': change,
-                'change_percent': change_percent,
-                'volume': 0,  # 指数没有成交量
-                'market': 'A股指数',
-                'currency': '点'
-            }
-            
-        except Exception as e:
-            self.logger.error(f"解析A股指数 {code} 数据失败: {e}")
-            return None
+        parts = self._extract_tencent_parts(text)
+        return self._parse_tencent_fields(parts, code, 'a_index', name) if parts is not None else None
     
-    def _parse_tencent_hk_index(self, text: str, code: str, name: str) -> Optional[Dict]:
+    def _parse_tencent_hk_index(self, text: str, code: str, name: str) -> Optional[Quote]:
         """解析腾讯港股指数数据"""
-        try:
-            # 提取数据部分
-            match = re.search(r'"([^"]*)"', text)
-            if not match:
-                return None
-                
-            data_str = match.group(1)
-            parts = data_str.split('~')
-            
-            if len(parts) < 10:
-                return None
-            
-            current_price = float(parts[3]) if parts[3] else 0
-            prev_close = float(parts[4]) if parts[4] else 0
-            open_price = float(parts[5]) if parts[5] else 0
-            high_price = float(parts[33]) if len(parts) > 33 and parts[33] else current_price
-            low_price = float(parts[34]) if len(parts) > 34 and parts[34] else current_price
-            
-            change = current_price - prev_close
-            change_percent = (change / prev_close * 100) if prev_close > 0 else 0
-            
-            return {
-                'code': code,
-                'name': name,
-                'current_price': current_price,
-                'open_price': open_price,
-                'high_price': high_price,
-                'low_price': low_price,
-                'prev_close': prev_close,
-                'change': change,
-                'change_percent': change_percent,
-                'volume': 0,  # 指数没有成交量
-                'market': '港股指数',
-                'currency': '点'
-            }
-            
-        except Exception as e:
-            self.logger.error(f"解析港股指数 {code} 数据失败: {e}")
-            return None
+        parts = self._extract_tencent_parts(text)
+        return self._parse_tencent_fields(parts, code, 'hk_index', name) if parts is not None else None
     
-    def _parse_tencent_hk_stock(self, text: str, code: str) -> Optional[Dict]:
+    def _parse_tencent_hk_stock(self, text: str, code: str) -> Optional[Quote]:
         """解析腾讯港股数据"""
-        try:
-            # 提取数据部分
-            match = re.search(r'"([^"]*)"', text)
-            if not match:
-                return None
-                
-            data_str = match.group(1)
-            parts = data_str.split('~')
-            
-            if len(parts) < 50:
-                return None
-            
-            name = parts[1]
-            current_price = float(parts[3]) if parts[3] else 0
-            prev_close = float(parts[4]) if parts[4] else 0
-            open_price = float(parts[5]) if parts[5] else 0
-            high_price = float(parts[33]) if parts[33] else 0
-            low_price = float(parts[34]) if parts[34] else 0
-            volume = int(float(parts[6])) if parts[6] else 0
-            
-            change = current_price - prev_close
-            change_percent = (change / prev_close * 100) if prev_close > 0 else 0
-            
-            return {
-                'code': code,
-                'name': name,
-                'current_price': current_price,
-                'open_price': open_price,
-                'high_price': high_price,
-                'low_price': low_price,
-                'prev_close': prev_close,
-                'change': change,
-                'change_percent': change_percent,
-                'volume': volume,
-                'market': '港股',
-                'currency': 'HK$'
-            }
-            
-        except Exception as e:
-            self.logger.error(f"解析港股 {code} 数据失败: {e}")
-            return None
+        parts = self._extract_tencent_parts(text)
+        return self._parse_tencent_fields(parts, code, 'hk') if parts is not None else None
     
-    def _parse_tencent_a_stock(self, text: str, code: str) -> Optional[Dict]:
+    def _parse_tencent_a_stock(self, text: str, code: str) -> Optional[Quote]:
         """解析腾讯A股数据"""
+        parts = self._extract_tencent_parts(text)
+        return self._parse_tencent_fields(parts, code, 'a') if parts is not None else None
+    
+    def _parse_tencent_fields(self, parts: List[str], code: str, kind: str, name: str = None) -> Optional[Quote]:
+        """
+        由腾讯接口字段构造股票/指数数据
+        Args:
+            parts: 按'~'拆分后的字段列表
+            code: 股票代码
+            kind: 代码类型（'a'、'hk'、'a_index'、'hk_index'）
+            name: 指数名称（指数使用固定映射的名称）
+        Returns:
+            股票/指数数据字典，字段不足或解析失败返回None
+        """
+        schema = _TENCENT_SCHEMAS[kind]
         try:
-            # 提取数据部分
-            match = re.search(r'"([^"]*)"', text)
-            if not match:
+            if len(parts) < schema.min_parts:
                 return None
-                
-            data_str = match.group(1)
-            parts = data_str.split('~')
             
-            if len(parts) < 50:
-                return None
+            # 字段3~5依次为：当前价、昨收价、开盘价，空值按0处理
+            current_price, prev_close, open_price = [float(x or 0) for x in parts[3:6]]
             
-            name = parts[1]
-            current_price = float(parts[3]) if parts[3] else 0
-            prev_close = float(parts[4]) if parts[4] else 0
-            open_price = float(parts[5]) if parts[5] else 0
-            high_price = float(parts[33]) if parts[33] else 0
-            low_price = float(parts[34]) if parts[34] else 0
-            volume = int(float(parts[6]) * 100) if parts[6] else 0  # 腾讯API返回的是手数，需要乘以100
+            if schema.volume_scale is None:
+                # 指数：最高/最低价缺失时取当前价，没有成交量
+                high_price = float(parts[33]) if len(parts) > 33 and parts[33] else current_price
+                low_price = float(parts[34]) if len(parts) > 34 and parts[34] else current_price
+                volume = 0
+            else:
+                name = parts[1]
+                high_price, low_price = [float(x or 0) for x in parts[33:35]]
+                volume = int(float(parts[6]) * schema.volume_scale) if parts[6] else 0
             
             change = current_price - prev_close
             change_percent = (change / prev_close * 100) if prev_close > 0 else 0
             
-            return {
-                'code': code,
-                'name': name,
-                'current_price': current_price,
-                'open_price': open_price,
-                'high_price': high_price,
-                'low_price': low_price,
-                'prev_close': prev_close,
-                'change': change,
-                'change_percent': change_percent,
-                'volume': volume,
-                'market': 'A股',
-                'currency': '¥'
-            }
+            return Quote(
+                code=code,
+                name=name,
+                current_price=current_price,
+                open_price=open_price,
+                high_price=high_price,
+                low_price=low_price,
+                prev_close=prev_close,
+                change=change,
+                change_percent=change_percent,
+                volume=volume,
+                market=schema.market,
+                currency=schema.currency
+            )
             
         except Exception as e:
-            self.logger.error(f"解析A股 {code} 数据失败: {e}")
-            return None
\ No newline at end of file
+            self.logger.error(f"解析{schema.market} {code} 数据失败: {e}")
+            return None
@@ -1,14 +1,43 @@
 import requests
 import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from stock_fetcher import MAX_FETCH_WORKERS, RETRY_STATUS_CODES
+
+# 复用同一个JSON解码器
+_JSON_DECODER = json.JSONDecoder()
+
+def _parse_date(date_str: str) -> datetime:
+    """
+    解析 'YYYY-MM-DD' 格式的日期（直接拆分构造，比 strptime 快得多）
+    Raises:
+        ValueError: 日期格式不正确
+    """
+    year, month, day = date_str.split('-')
+    return datetime(int(year), int(month), int(day))
 
 class HistoricalDataFetcher:
     """历史数据获取器"""
     
     def __init__(self):
         self.logger = logging.getLogger(__name__)
+        
+        # 复用同一个Session，保持长连接
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=MAX_FETCH_WORKERS,
+            pool_maxsize=MAX_FETCH_WORKERS,
+            max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=RETRY_STATUS_CODES)
+        )
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        })
     
     def get_historical_data(self, code: str, days: int = 60) -> Optional[List[Dict]]:
         """
@@ -28,6 +57,22 @@ class HistoricalDataFetcher:
             self.logger.error(f"获取股票 {code} 历史数据失败: {e}")
             return None
     
+    def get_historical_data_batch(self, codes: List[str], days: int = 60) -> Dict[str, Optional[List[Dict]]]:
+        """
+        并发获取多只股票的历史数据（网络IO密集，线程共享Session连接池）
+        Args:
+            codes: 股票代码列表
+            days: 获取天数，默认60天
+        Returns:
+            {股票代码: 历史数据列表}，获取失败的代码对应None
+        """
+        codes = list(dict.fromkeys(codes))
+        if not codes:
+            return {}
+        
+        with ThreadPoolExecutor(max_workers=min(MAX_FETCH_WORKERS, len(codes))) as executor:
+            return dict(zip(codes, executor.map(lambda code: self.get_historical_data(code, days), codes)))
+    
     def _is_hk_stock(self, code: str) -> bool:
         """判断是否为港股"""
         return len(code) == 5 and code.isdigit()
@@ -51,11 +96,7 @@ class HistoricalDataFetcher:
                 'fields': 'TCLOSE;HIGH;LOW;TOPEN;LCLOSE;CHG;PCHG;TURNOVER;VOTURNOVER;VATURNOVER'
             }
             
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            }
-            
-            response = requests.get(url, params=params, headers=headers, timeout=15)
+            response = self.session.get(url, params=params, timeout=15)
             response.encoding = 'gbk'
             
             if response.status_code == 200 and response.text:
@@ -99,11 +140,10 @@ class HistoricalDataFetcher:
             }
             
             headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
                 'Referer': 'http://gu.qq.com'
             }
             
-            response = requests.get(url, params=params, headers=headers, timeout=15)
+            response = self.session.get(url, params=params, headers=headers, timeout=15)
             
             if response.status_code == 200:
                 return self._parse_tencent_historical_data(response.text)
@@ -129,7 +169,7 @@ class HistoricalDataFetcher:
                 if len(parts) >= 10:
                     try:
                         date_str = parts[0].strip()
-                        date = datetime.strptime(date_str, '%Y-%m-%d')
+                        date = _parse_date(date_str)
                         
                         data.append({
                             'date': date,
@@ -156,15 +196,12 @@ class HistoricalDataFetcher:
     def _parse_tencent_historical_data(self, text: str) -> Optional[List[Dict]]:
         """解析腾讯历史数据"""
         try:
-            # 提取JSON数据
+            # 提取JSON数据：从第一个'{'处直接解码，不必先切出JSON子串（省去一次整段复制）
             start_pos = text.find('{')
-            end_pos = text.rfind('}') + 1
-            
-            if start_pos == -1 or end_pos == 0:
+            if start_pos == -1:
                 return None
-                
-            json_str = text[start_pos:end_pos]
-            data_dict = json.loads(json_str)
+            
+            data_dict = _JSON_DECODER.raw_decode(text, start_pos)[0]
             
             if 'data' not in data_dict:
                 return None
@@ -187,7 +224,7 @@ class HistoricalDataFetcher:
                 try:
                     # 腾讯数据格式: [date, open, close, high, low, volume, ...]
                     date_str = item[0]
-                    date = datetime.strptime(date_str, '%Y-%m-%d')
+                    date = _parse_date(date_str)
                     
                     data.append({
                         'date': date,
@@ -1,23 +1,87 @@
+import atexit
 import sqlite3
 import logging
-from typing import List, Optional
+import threading
+import weakref
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple
 from config import DATABASE_PATH
-from stock_fetcher import StockFetcher
+
+if TYPE_CHECKING:
+    from stock_fetcher import StockFetcher
+
+# 存活的StockManager实例（弱引用，不会延长实例的生命周期），进程退出时统一关闭连接
+_instances: 'weakref.WeakSet[StockManager]' = weakref.WeakSet()
+
+@atexit.register
+def _close_all():
+    """进程退出时关闭所有仍存活实例的数据库连接"""
+    for manager in list(_instances):
+        manager.close()
 
 class StockManager:
     """股票代码管理器"""
     
+    # 平均成交量的样本数（与信号检测使用的5期平均一致）
+    VOLUME_AVG_WINDOW = 5
+    
     def __init__(self):
         self.db_path = DATABASE_PATH
         self.logger = logging.getLogger(__name__)
-        self.stock_fetcher = StockFetcher()
+        self._stock_fetcher = None
+        
+        # 进程内复用同一个数据库连接（sqlite3按连接缓存已编译的语句），跨线程访问由锁串行化
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
+        _instances.add(self)
+        
         self._init_database()
     
+    @property
+    def stock_fetcher(self) -> 'StockFetcher':
+        """股票数据获取器（按需创建，仅在需要自动获取名称时使用）"""
+        if self._stock_fetcher is None:
+            from stock_fetcher import StockFetcher
+            self._stock_fetcher = StockFetcher()
+        return self._stock_fetcher
+    
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """
+        在持久连接上执行一个事务：持有锁期间独占连接，正常结束时提交，异常时回滚
+        （首次使用时打开连接：WAL模式下使用NORMAL同步级别减少fsync，临时表/排序放在内存中）
+        """
+        with self._lock:
+            if self._conn is None:
+                conn = sqlite3.connect(self.db_path, check_same_thread=False)
+                conn.execute('PRAGMA synchronous=NORMAL')
+                conn.execute('PRAGMA temp_store=MEMORY')
+                self._conn = conn
+            
+            with self._conn:
+                yield self._conn
+    
+    def close(self):
+        """关闭数据库连接（之后再访问数据库时会自动重新打开）"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+    
+    def __enter__(self) -> 'StockManager':
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
     def _init_database(self):
         """初始化数据库"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
+                # WAL模式是持久化的，只需设置一次
+                cursor.execute('PRAGMA journal_mode=WAL')
+                
                 cursor.execute('''
                     CREATE TABLE IF NOT EXISTS stocks (
                         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -40,6 +104,13 @@ class StockManager:
                     )
                 ''')
                 
+                # 按代码取最近成交量的覆盖索引（id即rowid，索引中已包含），查询无需回表
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_hist_code_ts_vol
+                    ON stock_history (code, timestamp DESC, volume)
+                ''')
+                cursor.execute('CREATE INDEX IF NOT EXISTS idx_stocks_active ON stocks (is_active, added_time)')
+                
                 conn.commit()
                 self.logger.info("数据库初始化完成")
                 
@@ -73,7 +144,7 @@ class StockManager:
                     self.logger.warning(f"无法获取股票 {code} 的名称，将使用空名称")
                     name = ""
             
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     INSERT OR REPLACE INTO stocks (code, name, market, is_active)
@@ -97,7 +168,7 @@ class StockManager:
             移除是否成功
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute('UPDATE stocks SET is_active = 0 WHERE code = ?', (code,))
                 
@@ -120,7 +191,7 @@ class StockManager:
             股票代码列表
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute('SELECT code FROM stocks WHERE is_active = 1 ORDER BY added_time')
                 results = cursor.fetchall()
@@ -140,7 +211,7 @@ class StockManager:
             股票信息列表
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute('''
                     SELECT code, name, market, added_time, is_active 
@@ -165,6 +236,40 @@ class StockManager:
             self.logger.error(f"列出股票信息失败: {e}")
             return []
     
+    def get_stock(self, code: str) -> Optional[dict]:
+        """
+        获取单只股票信息
+        Args:
+            code: 股票代码
+        Returns:
+            股票信息，不存在时返回None
+        """
+        try:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT code, name, market, added_time, is_active 
+                    FROM stocks 
+                    WHERE code = ? 
+                    LIMIT 1
+                ''', (code,))
+                row = cursor.fetchone()
+            
+            if row is None:
+                return None
+            
+            return {
+                'code': row[0],
+                'name': row[1] or '未知',
+                'market': row[2] or '未知',
+                'added_time': row[3],
+                'is_active': bool(row[4])
+            }
+            
+        except Exception as e:
+            self.logger.error(f"获取股票 {code} 信息失败: {e}")
+            return None
+    
     def update_stock_info(self, code: str, name: str) -> bool:
         """
         更新股票信息
@@ -175,7 +280,7 @@ class StockManager:
             更新是否成功
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
                 cursor.execute('UPDATE stocks SET name = ? WHERE code = ?', (name, code))
                 
@@ -193,35 +298,93 @@ class StockManager:
     def save_stock_history(self, code: str, price: float, change_percent: float, volume: int):
         """保存股票历史数据"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO stock_history (code, price, change_percent, volume)
-                    VALUES (?, ?, ?, ?)
-                ''', (code, price, change_percent, volume))
-                conn.commit()
+            with self._connect() as conn:
+                self._write_history(conn, [(code, price, change_percent, volume)])
                 
         except Exception as e:
             self.logger.error(f"保存股票历史数据失败: {e}")
     
+    def save_stock_snapshot(self, rows: Iterable[Tuple[str, float, float, int]],
+                            name_pairs: Iterable[Tuple[str, str]]) -> bool:
+        """
+        在同一个事务中保存一次监控的全部数据：历史数据和股票名称
+        Args:
+            rows: (code, price, change_percent, volume) 元组列表
+            name_pairs: (name, code) 元组列表，仅写入与数据库中不同的名称
+        Returns:
+            保存是否成功
+        """
+        try:
+            with self._connect() as conn:
+                self._write_history(conn, list(rows))
+                conn.executemany('UPDATE stocks SET name = ? WHERE code = ? AND name IS NOT ?',
+                                 [(name, code, name) for name, code in name_pairs])
+            return True
+                
+        except Exception as e:
+            self.logger.error(f"保存监控数据失败: {e}")
+            return False
+    
+    def _write_history(self, conn: sqlite3.Connection, rows: List[Tuple[str, float, float, int]]):
+        """写入历史数据（由调用方负责事务）"""
+        conn.executemany('''
+            INSERT INTO stock_history (code, price, change_percent, volume)
+            VALUES (?, ?, ?, ?)
+        ''', rows)
+    
+    def update_stock_names_bulk(self, pairs: Iterable[Tuple[str, str]]) -> int:
+        """
+        批量更新股票名称（单个事务）
+        Args:
+            pairs: (name, code) 元组列表
+        Returns:
+            更新的行数
+        """
+        try:
+            with self._connect() as conn:
+                cursor = conn.executemany('UPDATE stocks SET name = ? WHERE code = ?', pairs)
+                return cursor.rowcount
+                
+        except Exception as e:
+            self.logger.error(f"批量更新股票名称失败: {e}")
+            return 0
+    
+    def get_average_volumes(self, codes: List[str]) -> Dict[str, float]:
+        """
+        获取信号检测使用的平均成交量
+        口径与按历史成交量逐只计算时一致：get_historical_volumes 返回的列表（按时间倒序）中
+        最后 VOLUME_AVG_WINDOW 条的算术平均
+        Args:
+            codes: 股票代码列表
+        Returns:
+            {股票代码: 平均成交量} 字典（无历史数据的股票不包含在内）
+        """
+        window = self.VOLUME_AVG_WINDOW
+        return {code: sum(volumes[-window:]) / min(len(volumes), window)
+                for code, volumes in self.get_historical_volumes(codes).items() if volumes}
+    
     def get_historical_volumes(self, codes: List[str], days: int = 7) -> dict:
-        """获取历史成交量数据"""
+        """获取历史成交量数据（一次查询取出所有代码各自最近的记录）"""
+        if not codes:
+            return {}
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connect() as conn:
                 cursor = conn.cursor()
+                placeholders = ','.join('?' * len(codes))
+                cursor.execute(f'''
+                    SELECT code, volume FROM (
+                        SELECT code, volume, timestamp, id,
+                               ROW_NUMBER() OVER (PARTITION BY code ORDER BY timestamp DESC, id DESC) AS rn
+                        FROM stock_history
+                        WHERE code IN ({placeholders}) AND volume > 0
+                    )
+                    WHERE rn <= ?
+                    ORDER BY code, timestamp DESC, id DESC
+                ''', [*codes, days * 24])  # 假设每小时一条记录
                 
-                historical_data = {}
-                for code in codes:
-                    cursor.execute('''
-                        SELECT volume FROM stock_history 
-                        WHERE code = ? AND volume > 0
-                        ORDER BY timestamp DESC 
-                        LIMIT ?
-                    ''', (code, days * 24))  # 假设每小时一条记录
-                    
-                    results = cursor.fetchall()
-                    volumes = [row[0] for row in results]
-                    historical_data[code] = volumes
+                historical_data = {code: [] for code in codes}
+                for code, volume in cursor:
+                    historical_data[code].append(volume)
                 
                 return historical_data
                 
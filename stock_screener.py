@@ -6,6 +6,7 @@ from datetime import datetime, timedelta
 from dataclasses import dataclass
 from enum import Enum
 import statistics
+from stock_fetcher import StockFetcher
 from stock_fetcher_historical import HistoricalDataFetcher
 
 class ScreenerCriteria(Enum):
@@ -34,8 +35,13 @@ class ScreenerResult:
 class StockScreener:
     """智能股票筛选器"""
     
-    def __init__(self):
+    def __init__(self, stock_fetcher: Optional[StockFetcher] = None):
+        """
+        Args:
+            stock_fetcher: 实时行情获取器，默认新建一个；整个筛选过程共用，复用其缓存和HTTP连接池
+        """
         self.logger = logging.getLogger(__name__)
+        self.stock_fetcher = stock_fetcher or StockFetcher()
         self.historical_fetcher = HistoricalDataFetcher()
         
         # 筛选参数配置
@@ -66,9 +72,12 @@ class StockScreener:
         
         results = []
         
+        # 并发预取整个股票池的历史数据，逐只评估时不再串行请求（获取失败的按无历史数据处理）
+        histories = self.historical_fetcher.get_historical_data_batch(stock_pool, days=60)
+        
         for code in stock_pool:
             try:
-                result = self._evaluate_stock(code, criteria)
+                result = self._evaluate_stock(code, criteria, histories.get(code) or [])
                 if result and result.score > 0:
                     results.append(result)
             except Exception as e:
@@ -78,15 +87,16 @@ class StockScreener:
         results.sort(key=lambda x: x.score, reverse=True)
         return results
     
-    def _evaluate_stock(self, code: str, criteria: List[ScreenerCriteria]) -> Optional[ScreenerResult]:
-        """评估单只股票"""
+    def _evaluate_stock(self, code: str, criteria: List[ScreenerCriteria],
+                        historical_data: Optional[List[Dict]] = None) -> Optional[ScreenerResult]:
+        """评估单只股票（historical_data为预取的历史数据，未提供时单独获取）"""
         # 获取股票基础数据
         basic_data = self._get_basic_data(code)
         if not basic_data:
             return None
         
         # 获取技术指标数据
-        technical_data = self._get_technical_data(code)
+        technical_data = self._get_technical_data(code, historical_data)
         
         # 获取基本面数据
         fundamental_data = self._get_fundamental_data(code)
@@ -379,20 +389,18 @@ class StockScreener:
     def _get_basic_data(self, code: str) -> Optional[Dict]:
         """获取股票基础数据"""
         try:
-            # 这里可以集成现有的StockFetcher
-            from stock_fetcher import StockFetcher
-            fetcher = StockFetcher()
-            data = fetcher.get_stock_data([code])
+            data = self.stock_fetcher.get_stock_data([code])
             return data.get(code)
         except Exception as e:
             self.logger.error(f"获取股票 {code} 基础数据失败: {e}")
             return None
     
-    def _get_technical_data(self, code: str) -> Optional[Dict]:
-        """获取技术指标数据"""
+    def _get_technical_data(self, code: str, historical_data: Optional[List[Dict]] = None) -> Optional[Dict]:
+        """获取技术指标数据（historical_data为预取的历史数据，未提供时单独获取）"""
         try:
             # 获取历史数据
-            historical_data = self.historical_fetcher.get_historical_data(code, days=60)
+            if historical_data is None:
+                historical_data = self.historical_fetcher.get_historical_data(code, days=60)
             if historical_data is None or len(historical_data) == 0:
                 self.logger.warning(f"无法获取股票 {code} 的历史数据，使用模拟数据")
                 return self._get_mock_technical_data()
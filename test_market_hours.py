@@ -4,7 +4,7 @@
 """
 import sys
 from datetime import datetime, time
-import pytz
+from zoneinfo import ZoneInfo
 from market_hours import MarketHours
 
 def test_market_hours():
@@ -61,14 +61,14 @@ def test_market_hours():
     print("⏰ 特定时间点测试:")
     
     # 测试A股开市时间
-    china_tz = pytz.timezone('Asia/Shanghai')
+    china_tz = ZoneInfo('Asia/Shanghai')
     
     test_times = [
         # A股开市时间
-        china_tz.localize(datetime.now().replace(hour=10, minute=0, second=0, microsecond=0)),  # 上午开市
-        china_tz.localize(datetime.now().replace(hour=14, minute=0, second=0, microsecond=0)),  # 下午开市
-        china_tz.localize(datetime.now().replace(hour=12, minute=0, second=0, microsecond=0)),  # 午休
-        china_tz.localize(datetime.now().replace(hour=16, minute=0, second=0, microsecond=0)),  # 收市后
+        datetime.now().replace(hour=10, minute=0, second=0, microsecond=0, tzinfo=china_tz),  # 上午开市
+        datetime.now().replace(hour=14, minute=0, second=0, microsecond=0, tzinfo=china_tz),  # 下午开市
+        datetime.now().replace(hour=12, minute=0, second=0, microsecond=0, tzinfo=china_tz),  # 午休
+        datetime.now().replace(hour=16, minute=0, second=0, microsecond=0, tzinfo=china_tz),  # 收市后
     ]
     
     for test_time in test_times:
@@ -96,10 +96,57 @@ def test_next_trading_session():
     except Exception as e:
         print(f"港股下一个交易时段获取失败: {e}")
 
+def test_next_trading_session_month_end():
+    """测试月末收市后跨月查找下一个交易时段"""
+    print("\n📆 月末下一个交易时段测试:")
+    
+    market_hours = MarketHours()
+    china_tz = ZoneInfo('Asia/Shanghai')
+    
+    cases = [
+        ((2024, 1, 31), (2024, 2, 1)),
+        ((2024, 2, 29), (2024, 3, 1)),  # 闰年二月末
+    ]
+    
+    for day, expected_day in cases:
+        check_time = datetime(*day, 16, 30, tzinfo=china_tz)
+        for market in ('A股', '港股'):
+            next_start, next_end = market_hours.get_next_trading_session(market, check_time)
+            print(f"{market} {check_time.strftime('%Y-%m-%d %H:%M')} -> {next_start.strftime('%Y-%m-%d %H:%M')}")
+            assert (next_start.year, next_start.month, next_start.day) == expected_day
+            assert (next_start.hour, next_start.minute) == (9, 30)
+
+def test_session_end_boundaries():
+    """测试交易时段结束那一分钟内的秒级判断"""
+    print("\n⏱️ 交易时段边界测试:")
+    
+    market_hours = MarketHours()
+    china_tz = ZoneInfo('Asia/Shanghai')
+    
+    # 2024-03-04 为周一，两地均为交易日；时段结束时刻本身算开市，之后（含不足一秒）算休市
+    cases = [
+        ('A股', (11, 30, 0), True),
+        ('A股', (11, 30, 0, 500000), False),
+        ('A股', (11, 30, 30), False),
+        ('A股', (15, 0, 0), True),
+        ('A股', (15, 0, 45), False),
+        ('港股', (16, 0, 0), True),
+        ('港股', (16, 0, 30), False),
+    ]
+    
+    for market, hms, expected in cases:
+        check_time = datetime(2024, 3, 4, *hms, tzinfo=china_tz)
+        is_open = market_hours.is_market_open(market, check_time)
+        print(f"{market} {check_time.time().isoformat()}: {'🟢' if is_open else '🔴'}")
+        assert is_open == expected, f"{market} {check_time} 开市状态应为 {expected}"
+        assert market_hours.are_markets_open_batch([market], [check_time])[market] == [expected]
+
 if __name__ == '__main__':
     try:
         test_market_hours()
         test_next_trading_session()
+        test_next_trading_session_month_end()
+        test_session_end_boundaries()
         print("\n✅ 测试完成")
     except Exception as e:
         print(f"\n❌ 测试失败: {e}")
@@ -3,7 +3,7 @@
 测试混合市场开市时间场景
 """
 from datetime import datetime, time
-import pytz
+from zoneinfo import ZoneInfo
 from market_hours import MarketHours
 
 def test_mixed_market_scenarios():
@@ -11,8 +11,8 @@ def test_mixed_market_scenarios():
     print("🧪 测试混合市场开市场景\n")
     
     market_hours = MarketHours()
-    china_tz = pytz.timezone('Asia/Shanghai')
-    hk_tz = pytz.timezone('Asia/Hong_Kong')
+    china_tz = ZoneInfo('Asia/Shanghai')
+    hk_tz = ZoneInfo('Asia/Hong_Kong')
     
     # 测试股票代码
     mixed_stocks = ['000001', '600036', '00700', '09988']  # A股 + 港股
@@ -21,7 +21,7 @@ def test_mixed_market_scenarios():
     
     # 测试场景1: A股休市，港股开市（港股12:30-13:00午休时段）
     print("📊 场景1: A股休市，港股开市")
-    test_time = china_tz.localize(datetime.now().replace(hour=12, minute=30, second=0, microsecond=0))
+    test_time = datetime.now().replace(hour=12, minute=30, second=0, microsecond=0, tzinfo=china_tz)
     
     a_open = market_hours.is_market_open('A股', test_time)
     hk_open = market_hours.is_market_open('港股', test_time)
@@ -47,7 +47,7 @@ def test_mixed_market_scenarios():
     
     # 测试场景2: A股开市，港股休市（A股14:00，港股已收市）
     print("📊 场景2: A股开市，港股休市")
-    test_time2 = china_tz.localize(datetime.now().replace(hour=14, minute=0, second=0, microsecond=0))
+    test_time2 = datetime.now().replace(hour=14, minute=0, second=0, microsecond=0, tzinfo=china_tz)
     
     a_open2 = market_hours.is_market_open('A股', test_time2)
     hk_open2 = market_hours.is_market_open('港股', test_time2)
@@ -71,7 +71,7 @@ def test_mixed_market_scenarios():
     
     # 测试场景3: 都开市（上午10:00）
     print("📊 场景3: A股和港股都开市")
-    test_time3 = china_tz.localize(datetime.now().replace(hour=10, minute=0, second=0, microsecond=0))
+    test_time3 = datetime.now().replace(hour=10, minute=0, second=0, microsecond=0, tzinfo=china_tz)
     
     a_open3 = market_hours.is_market_open('A股', test_time3)
     hk_open3 = market_hours.is_market_open('港股', test_time3)
@@ -95,7 +95,7 @@ def test_mixed_market_scenarios():
     
     # 测试场景4: 都休市（晚上20:00）
     print("📊 场景4: A股和港股都休市")
-    test_time4 = china_tz.localize(datetime.now().replace(hour=20, minute=0, second=0, microsecond=0))
+    test_time4 = datetime.now().replace(hour=20, minute=0, second=0, microsecond=0, tzinfo=china_tz)
     
     a_open4 = market_hours.is_market_open('A股', test_time4)
     hk_open4 = market_hours.is_market_open('港股', test_time4)
@@ -115,6 +115,52 @@ def test_mixed_market_scenarios():
     filtered4 = market_hours.get_filtered_stock_codes(mixed_stocks)
     print(f"过滤后的股票: {filtered4}")
 
+def test_scheduler_waits_for_watched_markets():
+    """测试休市时调度器只等待自选股涉及的市场"""
+    print("\n💤 调度等待市场测试:")
+    
+    import main
+    
+    # 2025-10-02 11:00 (北京时间): A股国庆休市，港股正常交易
+    class FixedDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return cls(2025, 10, 2, 10, 0)
+    
+    class FakeManager:
+        def __init__(self, codes):
+            self.codes = codes
+        
+        def get_active_stocks(self):
+            return self.codes
+    
+    market_hours = MarketHours()
+    assert market_hours.get_markets_for_codes(['000001', '600036']) == ['A股']
+    assert market_hours.get_markets_for_codes(['00700', 'HSI', 'unknown']) == ['港股']
+    assert market_hours.get_markets_for_codes(['unknown']) == []
+    
+    original = (main.datetime, main._manager, main.CHECK_MARKET_HOURS)
+    main.datetime, main.CHECK_MARKET_HOURS = FixedDatetime, True
+    try:
+        interval = 3600
+        run_at = FixedDatetime.now() + main.timedelta(seconds=interval)
+        cases = [
+            (['000001', '600036'], datetime(2025, 10, 8, 9, 30)),  # 只有A股：等到节后A股开市，不在港股开市时唤醒
+            (['000001', '00700'], None),                            # 含港股：港股开市，按固定间隔执行
+        ]
+        for codes, expected_start in cases:
+            main._manager = lambda codes=codes: FakeManager(codes)
+            delay = main._seconds_until_next_run(interval)
+            wake_at = run_at + main.timedelta(seconds=delay - interval)
+            print(f"{codes}: 下次执行 {wake_at.strftime('%Y-%m-%d %H:%M')}")
+            if expected_start is None:
+                assert delay == interval
+            else:
+                assert wake_at == expected_start, f"{codes} 应在 {expected_start} 执行"
+    finally:
+        main.datetime, main._manager, main.CHECK_MARKET_HOURS = original
+
 if __name__ == '__main__':
     test_mixed_market_scenarios()
+    test_scheduler_waits_for_watched_markets()
     print("\n✅ 混合市场测试完成")
\ No newline at end of file
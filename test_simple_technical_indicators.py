@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+测试简化版技术指标计算（离线，使用随机生成的K线数据）
+"""
+import math
+import random
+import sys
+import simple_technical_indicators
+from simple_technical_indicators import SimpleTechnicalIndicators, IncrementalIndicators
+
+def _make_bars(rng: random.Random, n: int):
+    """生成n根随机游走的K线"""
+    price = rng.uniform(1, 100)
+    bars = []
+    for _ in range(n):
+        price = max(0.01, price * (1 + rng.gauss(0, 0.03)))
+        bars.append({
+            'close': price,
+            'high': price * (1 + rng.uniform(0, 0.02)),
+            'low': price * (1 - rng.uniform(0, 0.02)),
+            'volume': rng.randint(0, 10 ** 7)
+        })
+    return bars
+
+def _same(a, b) -> bool:
+    """递归比较指标结果（浮点数允许累计误差）"""
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_same(a[k], b[k]) for k in a)
+    if isinstance(a, str):
+        return a == b
+    return math.isclose(a, b, rel_tol=1e-6, abs_tol=1e-6)
+
+def test_incremental_matches_batch():
+    """测试增量计算（逐根push）与批量计算结果一致"""
+    print("🧪 增量计算与批量计算一致性测试")
+    
+    rng = random.Random(20240131)
+    for _ in range(200):
+        bars = _make_bars(rng, rng.randint(1, 150))
+        split = rng.randint(1, len(bars))
+        
+        incremental = IncrementalIndicators.from_history(bars[:split])
+        summary = incremental.get_signals_summary()
+        for bar in bars[split:]:
+            summary = incremental.push(bar)
+        
+        expected = SimpleTechnicalIndicators(bars).get_signals_summary()
+        assert _same(expected, summary), f"{len(bars)}根K线（前{split}根初始化）结果不一致"
+    
+    print("✅ 200组随机数据结果一致")
+
+def test_vectorized_matches_lists():
+    """测试NumPy向量化路径与纯Python列表路径结果一致"""
+    print("🧪 向量化与列表计算一致性测试")
+    
+    rng = random.Random(20240229)
+    original = simple_technical_indicators.NUMPY_MIN_BARS
+    try:
+        for _ in range(100):
+            bars = _make_bars(rng, rng.randint(1, 300))
+            
+            simple_technical_indicators.NUMPY_MIN_BARS = 1
+            vectorized = SimpleTechnicalIndicators(bars)
+            simple_technical_indicators.NUMPY_MIN_BARS = len(bars) + 1
+            lists = SimpleTechnicalIndicators(bars)
+            
+            assert vectorized.vectorized and not lists.vectorized
+            assert _same(vectorized.get_signals_summary(), lists.get_signals_summary()), f"{len(bars)}根K线结果不一致"
+    finally:
+        simple_technical_indicators.NUMPY_MIN_BARS = original
+    
+    print("✅ 100组随机数据结果一致")
+
+if __name__ == '__main__':
+    try:
+        test_incremental_matches_batch()
+        test_vectorized_matches_lists()
+        print("\n✅ 测试完成")
+    except AssertionError as e:
+        print(f"\n❌ 测试失败: {e}")
+        sys.exit(1)
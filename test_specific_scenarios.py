@@ -3,7 +3,7 @@
 测试特定的混合市场场景
 """
 from datetime import datetime, time
-import pytz
+from zoneinfo import ZoneInfo
 from market_hours import MarketHours
 
 def test_specific_mixed_scenarios():
@@ -11,7 +11,7 @@ def test_specific_mixed_scenarios():
     print("🧪 测试特定混合市场场景\n")
     
     market_hours = MarketHours()
-    china_tz = pytz.timezone('Asia/Shanghai')
+    china_tz = ZoneInfo('Asia/Shanghai')
     
     # 测试股票代码
     mixed_stocks = ['000001', '600036', '00700', '09988']  # A股 + 港股
@@ -20,7 +20,7 @@ def test_specific_mixed_scenarios():
     
     # 场景1: A股午休时间，港股开市 (12:00)
     print("📊 场景1: A股午休，港股开市 (12:00)")
-    test_time1 = china_tz.localize(datetime(2025, 9, 10, 12, 0, 0))
+    test_time1 = datetime(2025, 9, 10, 12, 0, 0, tzinfo=china_tz)
     
     a_open1 = market_hours.is_market_open('A股', test_time1)
     hk_open1 = market_hours.is_market_open('港股', test_time1)
@@ -45,7 +45,7 @@ def test_specific_mixed_scenarios():
     # 场景2: A股开市，港股休市 (15:30，A股已收市，港股也已收市)
     # 让我们用A股下午开市但港股午休的时间
     print("📊 场景2: A股开市，港股午休 (13:30)")
-    test_time2 = china_tz.localize(datetime(2025, 9, 10, 13, 30, 0))
+    test_time2 = datetime(2025, 9, 10, 13, 30, 0, tzinfo=china_tz)
     
     a_open2 = market_hours.is_market_open('A股', test_time2)
     hk_open2 = market_hours.is_market_open('港股', test_time2)
@@ -69,7 +69,7 @@ def test_specific_mixed_scenarios():
     
     # 场景3: A股收市，港股开市 (15:30)
     print("📊 场景3: A股收市，港股开市 (15:30)")
-    test_time3 = china_tz.localize(datetime(2025, 9, 10, 15, 30, 0))
+    test_time3 = datetime(2025, 9, 10, 15, 30, 0, tzinfo=china_tz)
     
     a_open3 = market_hours.is_market_open('A股', test_time3)
     hk_open3 = market_hours.is_market_open('港股', test_time3)
@@ -93,7 +93,7 @@ def test_specific_mixed_scenarios():
     
     # 场景4: 都开市 (10:00)
     print("📊 场景4: A股和港股都开市 (10:00)")
-    test_time4 = china_tz.localize(datetime(2025, 9, 10, 10, 0, 0))
+    test_time4 = datetime(2025, 9, 10, 10, 0, 0, tzinfo=china_tz)
     
     a_open4 = market_hours.is_market_open('A股', test_time4)
     hk_open4 = market_hours.is_market_open('港股', test_time4)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+测试股票数据获取器的离线逻辑（不访问网络，使用构造的腾讯行情响应）
+"""
+import sys
+from types import SimpleNamespace
+from stock_fetcher import StockFetcher, Quote
+
+def _tencent_line(symbol: str, name: str, current: float, prev_close: float) -> str:
+    """构造一行腾讯行情响应（50个字段，按接口格式填入用到的字段）"""
+    parts = ['0'] * 50
+    parts[1] = name
+    parts[3], parts[4], parts[5] = str(current), str(prev_close), str(prev_close)
+    parts[6] = '1234'
+    parts[33], parts[34] = str(current + 0.5), str(prev_close - 0.5)
+    payload = '~'.join(parts)
+    return f'v_{symbol}="{payload}";\n'
+
+def _offline_fetcher(lines):
+    """返回请求被替换为固定响应的获取器，并记录请求的URL"""
+    fetcher = StockFetcher()
+    fetcher.requested = []
+    
+    def fake_get(url, **kwargs):
+        fetcher.requested.append(url)
+        return SimpleNamespace(status_code=200, text=''.join(lines), encoding=None)
+    
+    fetcher.session.get = fake_get
+    return fetcher
+
+def test_quote_mapping():
+    """测试行情记录同时支持属性访问和只读字典访问"""
+    print("🧪 行情记录测试")
+    
+    fetcher = _offline_fetcher([_tencent_line('sh600000', '浦发银行', 10.5, 10.0)])
+    quote = fetcher.get_stock_data(['600000'])['600000']
+    
+    assert isinstance(quote, Quote)
+    assert quote.name == quote['name'] == quote.get('name') == '浦发银行'
+    assert quote['volume'] == 123400  # A股成交量由手换算为股
+    assert abs(quote['change_percent'] - 5.0) < 1e-9
+    assert quote.get('missing', 'default') == 'default' and 'market' in quote
+    assert dict(quote)['currency'] == '¥' and quote == dict(quote)
+    
+    try:
+        quote['get']
+        raise AssertionError("非字段名不应当作键访问")
+    except KeyError:
+        pass
+    
+    try:
+        quote.name = 'x'
+        raise AssertionError("行情记录应不可修改")
+    except AttributeError:
+        pass
+    
+    print(f"✅ {quote['name']}({quote['code']}) {quote['currency']}{quote['current_price']:.2f}")
+
+def test_stock_names_batch():
+    """测试批量获取名称：一次请求，指数名称使用固定映射且不请求接口"""
+    print("🧪 批量获取名称测试")
+    
+    fetcher = _offline_fetcher([
+        _tencent_line('sh600000', '浦发银行', 10.5, 10.0),
+        _tencent_line('hk00700', '腾讯控股', 300.0, 298.0),
+    ])
+    names = fetcher.get_stock_names_batch(['600000', '00700', 'sh000300', 'HSI', '000002'])
+    
+    assert names == {'600000': '浦发银行', '00700': '腾讯控股', 'sh000300': '沪深300', 'HSI': '恒生指数'}
+    assert len(fetcher.requested) == 1
+    assert 'sh000300' not in fetcher.requested[0] and 'hkHSI' not in fetcher.requested[0]
+    
+    # 名称已缓存，再次获取不请求接口
+    assert fetcher.get_stock_name('00700') == '腾讯控股'
+    assert len(fetcher.requested) == 1
+    
+    print(f"✅ {names}")
+
+if __name__ == '__main__':
+    try:
+        test_quote_mapping()
+        test_stock_names_batch()
+        print("\n✅ 测试完成")
+    except AssertionError as e:
+        print(f"\n❌ 测试失败: {e}")
+        sys.exit(1)
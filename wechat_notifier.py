@@ -11,6 +11,10 @@ class WeChatNotifier:
     def __init__(self):
         self.webhook_url = WECHAT_WEBHOOK_URL
         self.logger = logging.getLogger(__name__)
+        
+        # 复用HTTP连接（keep-alive），避免每条消息重新建立TLS连接
+        self.session = requests.Session()
+        self.session.headers.update({'Content-Type': 'application/json'})
     
     def send_stock_report(self, stock_data: Dict[str, Dict]) -> bool:
         """
@@ -153,14 +157,9 @@ class WeChatNotifier:
                 }
             }
             
-            headers = {
-                'Content-Type': 'application/json'
-            }
-            
-            response = requests.post(
+            response = self.session.post(
                 self.webhook_url,
                 data=json.dumps(payload, ensure_ascii=False).encode('utf-8'),
-                headers=headers,
                 timeout=10
             )
             